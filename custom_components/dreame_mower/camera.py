@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import collections
+import copy
 import voluptuous as vol
 from enum import IntEnum, IntFlag
 import time
@@ -11,6 +12,7 @@ from typing import Any, Dict, Final
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import partial
+from threading import Lock
 from aiohttp import web
 
 from homeassistant.components.camera import (
@@ -70,6 +72,10 @@ OBSTACLE_IMAGE_URL: Final = "/api/camera_map_obstacle_proxy/{0}?token={1}&index=
 RECOVERY_MAP_IMAGE_URL: Final = "/api/camera_recovery_map_proxy/{0}?token={1}&index={2}&v={3}"
 WIFI_MAP_IMAGE_URL: Final = "/api/camera_wifi_map_proxy/{0}?token={1}&v={2}"
 
+SCALED_IMAGE_CACHE_SIZE: Final = 4
+RENDER_CACHE_SIZE: Final = 8
+MAP_RENDERER_CACHE_SIZE: Final = 2
+
 
 class DreameMowerMapType(IntEnum):
     FLOOR_MAP = 0
@@ -307,15 +313,20 @@ async def async_setup_entry(
         square = entry.options.get(CONF_SQUARE, False)
         map_objects = entry.options.get(CONF_MAP_OBJECTS, MAP_OBJECTS.keys())
 
+        render_service = DreameMowerMapRenderService(
+            color_scheme,
+            icon_set,
+            map_objects,
+            coordinator.device.capability.robot_type,
+            low_resolution,
+            square,
+        )
+
         async_add_entities(
             DreameMowerCameraEntity(
                 coordinator,
                 description,
-                color_scheme,
-                icon_set,
-                map_objects,
-                low_resolution,
-                square,
+                render_service,
             )
             for description in CAMERAS
         )
@@ -325,11 +336,7 @@ async def async_setup_entry(
             coordinator,
             {},
             async_add_entities,
-            color_scheme,
-            icon_set,
-            map_objects,
-            low_resolution,
-            square,
+            render_service,
         )
         platform = entity_platform.current_platform.get()
         platform.async_register_entity_service("update", {}, DreameMowerCameraEntity.async_update.__name__)
@@ -353,11 +360,7 @@ def async_update_map_cameras(
     coordinator: DreameMowerDataUpdateCoordinator,
     current: dict[str, list[DreameMowerCameraEntity]],
     async_add_entities,
-    color_scheme: str,
-    icon_set: str,
-    map_objects: list[str],
-    low_resolution: bool,
-    square: bool,
+    render_service: DreameMowerMapRenderService,
 ) -> None:
     new_indexes = set([k for k in range(1, len(coordinator.device.status.map_list) + 1)])
     current_ids = set(current)
@@ -375,16 +378,12 @@ def async_update_map_cameras(
                     entity_category=EntityCategory.CONFIG,
                     icon="mdi:map-search",
                 ),
-                color_scheme,
-                icon_set,
-                map_objects,
-                low_resolution,
-                square,
+                render_service,
                 map_index,
             )
         ]
 
-        if coordinator.device.capability.wifi_map and not low_resolution:
+        if coordinator.device.capability.wifi_map and not render_service.low_resolution:
             current[map_index].append(
                 DreameMowerCameraEntity(
                     coordinator,
@@ -395,11 +394,7 @@ def async_update_map_cameras(
                         map_type=DreameMowerMapType.WIFI_MAP,
                         entity_registry_enabled_default=False,
                     ),
-                    color_scheme,
-                    icon_set,
-                    map_objects,
-                    True,
-                    square,
+                    render_service,
                     map_index,
                 )
             )
@@ -424,20 +419,140 @@ def async_remove_map_cameras(
     del current[map_index]
 
 
-class DreameMowerCameraEntity(DreameMowerEntity, Camera):
-    """Defines a Dreame Mower Camera entity."""
+class DreameMowerMapRenderService:
+    """Map renderers and rendered map images shared between the camera entities of a device."""
 
-    _unrecorded_attributes = frozenset(CAMERA_UNRECORDED_ATTRIBUTES)
+    LIVE_MAP: Final = "live"
+    SAVED_MAP: Final = "saved"
+    WIFI_MAP: Final = "wifi"
+    PROXY: Final = "proxy"
+    PREVIEW: Final = "preview"
 
     def __init__(
         self,
-        coordinator: DreameMowerDataUpdateCoordinator,
-        description: DreameMowerCameraEntityDescription,
         color_scheme: str = None,
         icon_set: str = None,
         map_objects: list[str] = None,
+        robot_type: int = 0,
         low_resolution: bool = False,
         square: bool = False,
+    ) -> None:
+        self._color_scheme = color_scheme
+        self._icon_set = icon_set
+        self._map_objects = map_objects
+        self._robot_type = robot_type
+        self._low_resolution = low_resolution
+        self._square = square
+        self._renderers: dict[str, DreameMowerMapRenderer] = {}
+        self._map_renderers: dict[str, dict[int, tuple[DreameMowerMapRenderer, Lock]]] = {}
+        self._images: dict[tuple[str, int], tuple[tuple, bytes, Any]] = {}
+        # Maps are rendered in the executor, every map renderer has its own lock so a render only waits for the
+        # previous render of the same map. Service lock only guards the renderer and image lookups.
+        self._lock = Lock()
+        self._preview_lock = Lock()
+
+    def renderer(self, key: str) -> DreameMowerMapRenderer:
+        """Renderer of a map type for map independent images."""
+        with self._lock:
+            renderer = self._renderers.get(key)
+            if renderer is None:
+                renderer = self._create_renderer(key)
+                self._renderers[key] = renderer
+            return renderer
+
+    def _map_renderer(self, key: str, map_id: int) -> tuple[DreameMowerMapRenderer, Lock]:
+        # Last rendered maps of a type keep their own renderers, cached layers are not discarded when they are
+        # rendered in turn
+        renderers = self._map_renderers.setdefault(key, {})
+        item = renderers.pop(map_id, None)
+        if item is None:
+            while len(renderers) >= MAP_RENDERER_CACHE_SIZE:
+                # Least recently used renderer is released first
+                del renderers[next(iter(renderers))]
+            item = (self._create_renderer(key), Lock())
+        renderers[map_id] = item
+        return item
+
+    def _create_renderer(self, key: str) -> DreameMowerMapRenderer:
+        wifi_map = bool(key == self.WIFI_MAP)
+        preview = bool(key == self.PREVIEW)
+        if preview:
+            # Only base colors of the map without any objects or icons
+            map_objects = ["color"] if "color" in self._map_objects else []
+        else:
+            map_objects = ["charger"] if wifi_map else self._map_objects
+        return DreameMowerMapRenderer(
+            self._color_scheme,
+            self._icon_set,
+            map_objects,
+            self._robot_type,
+            True if wifi_map or preview else self._low_resolution,
+            self._square,
+            key != self.PROXY and not preview,
+        )
+
+    def _image(self, item_key: tuple[str, int], request: tuple) -> tuple[bytes, Any] | None:
+        item = self._images.get(item_key)
+        if item and item[0] == request:
+            return item[1], item[2]
+        return None
+
+    def render_map(self, key: str, map_data, robot_status: int = 0, station_status: int = 0) -> tuple[bytes, Any]:
+        """Returns the rendered image and its calibration points, same request for a map is only rendered once."""
+        item_key = (key, map_data.map_id)
+        request = (map_data.frame_id, map_data.last_updated, robot_status, station_status)
+        with self._lock:
+            item = self._image(item_key, request)
+            if item:
+                return item
+            renderer, lock = self._map_renderer(key, map_data.map_id)
+
+        with lock:
+            # Same request may be rendered by another camera while waiting for the lock
+            with self._lock:
+                item = self._image(item_key, request)
+            if item:
+                return item
+
+            image = renderer.render_map(map_data, robot_status, station_status)
+            calibration_points = renderer.calibration_points
+            if image and renderer.render_complete:
+                with self._lock:
+                    if item_key in self._images:
+                        del self._images[item_key]
+                    while len(self._images) >= RENDER_CACHE_SIZE:
+                        del self._images[next(iter(self._images))]
+                    self._images[item_key] = (request, image, calibration_points)
+        return image, calibration_points
+
+    def has_image(self, key: str, map_id: int) -> bool:
+        with self._lock:
+            return (key, map_id) in self._images
+
+    def render_preview(self, map_data) -> bytes:
+        """Quick low resolution render of map data that is not prepared for rendering yet"""
+        # Renderer only writes the calculated dimensions back to the map data, other fields are shared
+        preview_data = copy.copy(map_data)
+        preview_data.dimensions = copy.deepcopy(map_data.dimensions)
+        renderer = self.renderer(self.PREVIEW)
+        with self._preview_lock:
+            return renderer.render_map(preview_data)
+
+    @property
+    def low_resolution(self) -> bool:
+        return self._low_resolution
+
+
+class DreameMowerCameraEntity(DreameMowerEntity, Camera):
+    """Defines a Dreame Mower Camera entity."""
+
+    _unrecorded_attributes = frozenset(CAMERA_UNRECORDED_ATTRIBUTES)
+
+    def __init__(
+        self,
+        coordinator: DreameMowerDataUpdateCoordinator,
+        description: DreameMowerCameraEntityDescription,
+        render_service: DreameMowerMapRenderService,
         map_index: int = 0,
     ) -> None:
         """Initialize a Dreame Mower Camera entity."""
@@ -458,30 +573,29 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
         self._device_active = None
         self._error = None
         self._proxy_renderer = None
+        self._render_service = render_service
+        self._render_key = None
+        self._rendered_map_id = None
+        self._rendering = False
 
         if description.map_type == DreameMowerMapType.JSON_MAP_DATA:
             self._renderer = DreameMowerMapDataJsonRenderer()
             self.content_type = JSON_CONTENT_TYPE
         else:
-            self._renderer = DreameMowerMapRenderer(
-                color_scheme,
-                icon_set,
-                ["charger"] if self.wifi_map else map_objects,
-                self.device.capability.robot_type,
-                low_resolution,
-                square,
-            )
+            if self.wifi_map:
+                self._render_key = DreameMowerMapRenderService.WIFI_MAP
+            elif map_index:
+                self._render_key = DreameMowerMapRenderService.SAVED_MAP
+            else:
+                self._render_key = DreameMowerMapRenderService.LIVE_MAP
+            self._renderer = render_service.renderer(self._render_key)
             if not self.wifi_map:
-                self._proxy_renderer = DreameMowerMapRenderer(
-                    color_scheme,
-                    icon_set,
-                    map_objects,
-                    self.device.capability.robot_type,
-                    low_resolution,
-                    square,
-                    False,
-                )
+                self._proxy_renderer = render_service.renderer(DreameMowerMapRenderService.PROXY)
         self._image = None
+        self._scaled_images = {}
+        self._scaled_images_source = None
+        self._disconnected_image = None
+        self._disconnected_image_source = None
         self._default_map = True
         self._proxy_images = {}
         self.map_index = map_index
@@ -571,6 +685,9 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
                     self.device.update_map()
                 self.update()
             self._should_poll = True
+
+        if (width or height) and self._image and not self.map_data_json:
+            return await self._get_scaled_image(self._image, width, height)
         return self._image
 
     async def handle_async_still_stream(self, request: web.Request, interval: float) -> web.StreamResponse:
@@ -642,23 +759,29 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
                 self.map_index == 0
                 and not self.map_data_json
                 and map_data.last_updated != self._last_updated
-                and not self._renderer.render_complete
+                and not self._render_complete
             ):
                 LOGGER.warning("Waiting render complete")
 
-            if self._renderer.render_complete and map_data.last_updated != self._last_updated:
+            if self._render_complete and map_data.last_updated != self._last_updated:
                 if self.map_index == 0 and not self.map_data_json:
                     LOGGER.debug("Update map")
 
+                # Render a preview first when there is no rendered image of the map yet
+                preview = bool(
+                    not self.map_data_json and (self._default_map or self._rendered_map_id != map_data.map_id)
+                )
                 self._last_updated = map_data.last_updated
                 self._frame_id = map_data.frame_id
                 self._default_map = False
+                self._rendering = True
 
                 self.coordinator.hass.async_create_task(
                     self._update_image(
-                        self.device.get_map_for_render(self._map_data),
+                        map_data,
                         self.device.status.robot_status,
                         self.device.status.station_status,
+                        preview,
                     )
                 )
         elif not self._default_map:
@@ -773,14 +896,53 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
             )
         return "{}"
 
-    async def _update_image(self, map_data, robot_status, station_status) -> None:
+    async def _update_image(self, map_data, robot_status, station_status, preview=False) -> None:
+        hass = self.coordinator.hass
         try:
-            self._image = self._renderer.render_map(map_data, robot_status, station_status)
-            if not self.map_data_json and self._calibration_points != self._renderer.calibration_points:
-                self._calibration_points = self._renderer.calibration_points
+            preview = bool(preview and not self._render_service.has_image(self._render_key, map_data.map_id))
+            if preview:
+                # Serve base colors of the map until optimizer and object layers are completed
+                self._image = await hass.async_add_executor_job(self._render_service.render_preview, map_data)
+                if self.hass:
+                    self.async_write_ha_state()
+
+            map_data = await hass.async_add_executor_job(self.device.get_map_for_render, map_data)
+            if self.map_data_json:
+                self._image = await hass.async_add_executor_job(
+                    self._renderer.render_map, map_data, robot_status, station_status
+                )
+                return
+
+            self._image, calibration_points = await hass.async_add_executor_job(
+                self._render_service.render_map, self._render_key, map_data, robot_status, station_status
+            )
+            self._rendered_map_id = map_data.map_id
+            if self._calibration_points != calibration_points:
+                self._calibration_points = calibration_points
                 self.coordinator.set_updated_data()
+            elif preview and self.hass:
+                self.async_write_ha_state()
         except Exception:
             LOGGER.warn("Map render Failed: %s", traceback.format_exc())
+        finally:
+            self._rendering = False
+
+    async def _get_scaled_image(self, image, width, height):
+        # Scaled images are only valid for the image they are created from
+        if self._scaled_images_source is not image:
+            self._scaled_images_source = image
+            self._scaled_images = {}
+
+        item_key = (width, height)
+        if item_key in self._scaled_images:
+            return self._scaled_images[item_key]
+
+        scaled_image = await self.hass.async_add_executor_job(self._renderer.resize_image, image, width, height)
+        if scaled_image and self._scaled_images_source is image:
+            while len(self._scaled_images) >= SCALED_IMAGE_CACHE_SIZE:
+                del self._scaled_images[next(iter(self._scaled_images))]
+            self._scaled_images[item_key] = scaled_image
+        return scaled_image
 
     def _get_proxy_image(self, index, map_data, info_text, cache_key, max_item=2):
         item_key = f"i{index}_t{int(info_text)}_d{int(map_data.last_updated)}"
@@ -823,6 +985,11 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
     def wifi_map(self) -> bool:
         return bool(self.entity_description.map_type == DreameMowerMapType.WIFI_MAP)
 
+    @property
+    def _render_complete(self) -> bool:
+        """Map is rendered in the executor, next render is started after the previous one is completed"""
+        return not self._rendering and self._renderer.render_complete
+
     @property
     def map_data_json(self) -> bool:
         return bool(self.entity_description.map_type == DreameMowerMapType.JSON_MAP_DATA)
@@ -838,7 +1005,13 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
     @property
     def _default_map_image(self) -> Any:
         if self.device and self._image and not self.device.cloud_connected:
-            return self._renderer.disconnected_map_image
+            if self.map_data_json:
+                return self._renderer.disconnected_map_image
+            # Blurred image is only created once for every rendered image
+            if self._disconnected_image_source is not self._image:
+                self._disconnected_image_source = self._image
+                self._disconnected_image = self._renderer.render_disconnected_map_image(self._image)
+            return self._disconnected_image
         return self._renderer.default_map_image
 
     @property
@@ -881,7 +1054,9 @@ class DreameMowerCameraEntity(DreameMowerEntity, Camera):
                     attributes = {}
 
                 attributes[ATTR_CALIBRATION] = (
-                    self._calibration_points if self._calibration_points else self._renderer.calibration_points
+                    self._calibration_points
+                    if self._calibration_points or self._render_key
+                    else self._renderer.calibration_points
                 )
             elif self.device.cloud_connected:
                 attributes = {ATTR_CALIBRATION: self._renderer.default_calibration_points}
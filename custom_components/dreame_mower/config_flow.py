@@ -40,6 +40,7 @@ from .const import (
     CONF_PREFER_CLOUD,
     CONF_LOW_RESOLUTION,
     CONF_SQUARE,
+    CONF_TRAFFIC_CAPTURE,
     NOTIFICATION,
     MAP_OBJECTS,
     NOTIFICATION_ID_2FA_LOGIN,
@@ -97,6 +98,10 @@ class DreameMowerOptionsFlowHandler(OptionsFlow):
                         CONF_LOW_RESOLUTION,
                         default=options.get(CONF_LOW_RESOLUTION, False),
                     ): bool,
+                    vol.Required(
+                        CONF_TRAFFIC_CAPTURE,
+                        default=options.get(CONF_TRAFFIC_CAPTURE, False),
+                    ): bool,
                 }
             )
             if data.get(CONF_ACCOUNT_TYPE, "mi") == "mi":
@@ -23,6 +23,7 @@ CONF_PREFER_CLOUD: Final = "prefer_cloud"
 CONF_LOW_RESOLUTION: Final = "low_resolution"
 CONF_SQUARE: Final = "square"
 CONF_ACCOUNT_TYPE: Final = "account_type"
+CONF_TRAFFIC_CAPTURE: Final = "traffic_capture"
 
 CONTENT_TYPE: Final = "image/png"
 
@@ -32,6 +32,7 @@ from .const import (
     CONF_DID,
     CONF_ACCOUNT_TYPE,
     CONF_PREFER_CLOUD,
+    CONF_TRAFFIC_CAPTURE,
     CONTENT_TYPE,
     NOTIFICATION_CLEANUP_COMPLETED,
     NOTIFICATION_RESUME_CLEANING,
@@ -105,6 +106,7 @@ class DreameMowerDataUpdateCoordinator(DataUpdateCoordinator[DreameMowerDevice])
             entry.options.get(CONF_PREFER_CLOUD, False),
             entry.data.get(CONF_ACCOUNT_TYPE, "mi"),
             entry.data.get(CONF_DID),
+            entry.options.get(CONF_TRAFFIC_CAPTURE, False),
         )
 
         self._device.listen(self._error_changed, DreameMowerProperty.ERROR)
@@ -0,0 +1,38 @@
+"""Diagnostics support for Dreame Mower."""
+
+from __future__ import annotations
+
+import base64
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_MAC, CONF_DID
+from .coordinator import DreameMowerDataUpdateCoordinator
+
+TO_REDACT = {CONF_HOST, CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME, CONF_MAC, CONF_DID}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: DreameMowerDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device = coordinator.device
+
+    # Captured traffic is exported with identifiers redacted as base64 encoded zlib compressed JSON lines
+    traffic_capture = await hass.async_add_executor_job(device.export_traffic_capture)
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "device": {
+            "model": device.info.model if device.info else None,
+            "firmware_version": device.info.firmware_version if device.info else None,
+            "capabilities": device.capability.list,
+        },
+        "traffic_capture": base64.b64encode(traffic_capture).decode("utf-8") if traffic_capture else None,
+    }
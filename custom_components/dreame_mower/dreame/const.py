@@ -287,6 +287,15 @@ MAP_REQUEST_PARAMETER_TYPE: Final = "type"
 MAP_REQUEST_PARAMETER_INDEX: Final = "index"
 MAP_REQUEST_PARAMETER_ZONE_ID: Final = "zoneID"
 
+MAP_PARTIAL_QUEUE_SIZE: Final = 64
+MAP_PARTIAL_QUEUE_REQUEST_SIZE: Final = 8
+MAP_MISSING_FRAME_REQUEST_INTERVAL: Final = 3
+MAP_MISSING_FRAME_REQUEST_MAX_INTERVAL: Final = 60
+MAP_RENDERER_TILE_SIZE: Final = 32
+MAP_RENDERER_PNG_COMPRESS_LEVEL: Final = 6
+MAP_DECOMPRESSED_MAX_AREA: Final = 4096 * 4096
+MAP_DECOMPRESSED_JSON_MAX_SIZE: Final = 4 * 1024 * 1024
+
 MAP_DATA_JSON_CLASS: Final = "ValetudoMap"
 MAP_DATA_JSON_PARAMETER_CLASS: Final = "__class"
 MAP_DATA_JSON_PARAMETER_SIZE: Final = "size"
@@ -321,6 +330,11 @@ MAP_DATA_JSON_PARAMETER_FLOOR: Final = "floor"
 MAP_DATA_JSON_PARAMETER_WALL: Final = "wall"
 MAP_DATA_JSON_PARAMETER_SEGMENT: Final = "segment"
 
+DEVICE_MAX_IN_FLIGHT_REQUESTS: Final = 4
+TRAFFIC_CAPTURE_SIZE: Final = 200
+TRAFFIC_CAPTURE_LOG_SAMPLE_RATE: Final = 50
+TRAFFIC_CAPTURE_REDACT: Final = {"did", "uid", "mac", "localip", "ssid", "token", "key", "url", "location"}
+
 DEVICE_KEY: Final = (
     "H4sIAAAAAAAACj2TyZLaMBCGXyXl8xwsqW1LubGUhwmYxSEkJJUDmwEDXgYYZpLKu0dWd/v0f3K3elP7r1fHw8Nb2anTeD7NhuPQ+/zpl/cqpW+830/eJP42Opl5qaI63f5YKrYK33vyNsKXm4Jgf278t8U2nak/utPL+9t+Urb+omzM4/RRdPMgvo6n++54PW/N0kZpNEBVpIFiXTNsGLYMF4Ybw53hgRBSmKjVlQPl2nDafsBEFjC+hR1DxrAnwHBKhKwVgsJ2lNKsFD6gfAH2p0I6hz5WqkJBnmGEGpFnRGdNZx2Qo4EWqD4DOcOJ4cxwZcAZKYMlgi9Q6SWAerKK4S3g5C0cGAoESXclkNJdekUAQzHAYEEQ+PhoQIOAkNKG1BZonC1Qv6Cxf9BUr6GcRtIFI/HlwLgbRmFHVl1oq646q2zHqowS5IitW8UGGzgRROhKU7LqOjQg8QpI3Ww3XHtvaia7t/X3RfelK9vtDt3yl/n7c1HuB9nivssW2TubwW+sKvbzI9yzbrIaiPkhaa28ZLRTghpWNiduAu2Q9l8JaERYXKOrJkGRqZ9HmdQ67wedzuTCCexOWmt8KbLVi6zWu4t/ioJba6WFtFASRAh2KqjAqwgBboai/80qbzNuhlX6oLkLLblq9tW0PZFo6nqkH36QLUezL0k6CJO8rQsaazqeQKWCtZwNV+XboOeslRRg3MTDaXwcTZfJYPRxrqI0ZbNwZThwfrouvpptvZ+rXlU970QbphmtU/IHv2ZofnUHNsK//+u61l1HBQAA"
 )
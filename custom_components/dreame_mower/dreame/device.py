@@ -60,6 +60,7 @@ from .types import (
     ATTR_ACTIVE_SEGMENTS,
     ATTR_PREDEFINED_POINTS,
     ATTR_ACTIVE_CRUISE_POINTS,
+    device_capability_registry,
 )
 from .const import (
     STATE_UNKNOWN,
@@ -159,6 +160,7 @@ class DreameMowerDevice:
         prefer_cloud: bool = False,
         account_type: str = "mi",
         device_id: str = None,
+        traffic_capture: bool = False,
     ) -> None:
         # Used for easy filtering the device from cloud device list and generating unique ids
         self.info = None
@@ -336,6 +338,8 @@ class DreameMowerDevice:
             account_type,
             device_id,
         )
+        # Capturing is only available with a cloud account
+        self._protocol.capture.enabled = bool(traffic_capture and self._protocol.cloud)
         if self._protocol.cloud:
             self._map_manager = DreameMapMowerMapManager(self._protocol)
 
@@ -467,9 +471,7 @@ class DreameMowerDevice:
                 _LOGGER.debug("Property %s Not Available", DreameMowerProperty(did).name)
 
         if not self._ready:
-            self.capability.refresh(
-                json.loads(zlib.decompress(base64.b64decode(DREAME_MODEL_CAPABILITIES), zlib.MAX_WBITS | 32))
-            )
+            self.capability.refresh(device_capability_registry(DREAME_MODEL_CAPABILITIES))
 
         for callback in callbacks:
             callback[0](callback[1])
@@ -519,13 +521,16 @@ class DreameMowerDevice:
                 if "aiid" not in mapping and (not self._ready or prop.value in self.data):
                     property_list.append({"did": str(prop.value), **mapping})
 
-        props = property_list.copy()
+        batches = [property_list[i : i + 15] for i in range(0, len(property_list), 15)]
         results = []
-        while props:
-            result = self._protocol.get_properties(props[:15])
-            if result is not None:
-                results.extend(result)
-                props[:] = props[15:]
+        while batches:
+            pending = []
+            for batch, result in zip(batches, self._protocol.get_properties_batch(batches)):
+                if result is not None:
+                    results.extend(result)
+                else:
+                    pending.append(batch)
+            batches = pending
 
         return self._handle_properties(results)
 
@@ -1435,6 +1440,12 @@ class DreameMowerDevice:
             self._map_manager.disconnect()
         self._property_changed()
 
+    def export_traffic_capture(self) -> bytes | None:
+        """Export captured device and cloud traffic when capturing is enabled."""
+        if self._protocol.capture.enabled:
+            return self._protocol.capture.export()
+        return None
+
     def listen(self, callback, property: DreameMowerProperty = None) -> None:
         """Set callback functions for external listeners"""
         if callback is None:
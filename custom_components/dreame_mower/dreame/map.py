@@ -6,11 +6,13 @@ import base64
 import json
 import zlib
 import re
+import struct
 import logging
 import traceback
 import copy
 import numpy as np
 import hashlib
+import heapq
 import textwrap
 from datetime import datetime
 from py_mini_racer import MiniRacer
@@ -31,7 +33,7 @@ from typing import Any
 from time import sleep
 from io import BytesIO
 from typing import Optional, Tuple
-from functools import cmp_to_key
+from functools import cmp_to_key, lru_cache
 from threading import Timer
 from .resources import *
 from .protocol import DreameMowerProtocol
@@ -67,6 +69,7 @@ from .types import (
     ObstacleIgnoreStatus,
     MapImageDimensions,
     MapRendererLayer,
+    MapRendererSprite,
     MapRendererColorScheme,
     MapRendererConfig,
     MapRendererData,
@@ -104,6 +107,14 @@ from .const import (
     MAP_REQUEST_PARAMETER_TYPE,
     MAP_REQUEST_PARAMETER_INDEX,
     MAP_REQUEST_PARAMETER_ZONE_ID,
+    MAP_PARTIAL_QUEUE_SIZE,
+    MAP_PARTIAL_QUEUE_REQUEST_SIZE,
+    MAP_MISSING_FRAME_REQUEST_INTERVAL,
+    MAP_MISSING_FRAME_REQUEST_MAX_INTERVAL,
+    MAP_RENDERER_TILE_SIZE,
+    MAP_RENDERER_PNG_COMPRESS_LEVEL,
+    MAP_DECOMPRESSED_MAX_AREA,
+    MAP_DECOMPRESSED_JSON_MAX_SIZE,
     MAP_DATA_JSON_CLASS,
     MAP_DATA_JSON_PARAMETER_CLASS,
     MAP_DATA_JSON_PARAMETER_SIZE,
@@ -142,6 +153,64 @@ from .const import (
 _LOGGER = logging.getLogger(__name__)
 
 
+class DreameMowerPartialMapQueue:
+    """Frame id ordered queue of P frames waiting for their preceding frames."""
+
+    def __init__(self, max_size: int = MAP_PARTIAL_QUEUE_SIZE) -> None:
+        self._max_size: int = max_size
+        self._map_id: int = None
+        self._frame_ids: list[int] = []
+        self._frames: dict[int, MapDataPartial] = {}
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def clear(self, map_id: int = None) -> None:
+        self._map_id = map_id
+        self._frame_ids = []
+        self._frames = {}
+
+    def push(self, partial_map: MapDataPartial) -> bool:
+        if partial_map.map_id != self._map_id:
+            self.clear(partial_map.map_id)
+
+        frame_id = partial_map.frame_id
+        if frame_id in self._frames:
+            self._frames[frame_id] = partial_map
+            return True
+
+        if len(self._frames) >= self._max_size:
+            return False
+
+        self._frames[frame_id] = partial_map
+        heapq.heappush(self._frame_ids, frame_id)
+        return True
+
+    def discard(self, map_id: int, frame_id: int = None) -> None:
+        """Drop queued frames of other maps and frames that are not newer than frame_id"""
+        if map_id != self._map_id:
+            self.clear(map_id)
+            return
+
+        if frame_id is not None:
+            while self._frame_ids and self._frame_ids[0] <= frame_id:
+                del self._frames[heapq.heappop(self._frame_ids)]
+
+    def pop(self, map_id: int, frame_id: int) -> MapDataPartial | None:
+        self.discard(map_id, frame_id - 1)
+        if self._frame_ids and self._frame_ids[0] == frame_id:
+            heapq.heappop(self._frame_ids)
+            return self._frames.pop(frame_id)
+        return None
+
+    def missing_frame_id(self, map_id: int, frame_id: int) -> int | None:
+        """Returns the first missing frame id if there is a gap between frame_id and the queued frames"""
+        self.discard(map_id, frame_id - 1)
+        if self._frame_ids and self._frame_ids[0] != frame_id:
+            return frame_id
+        return None
+
+
 class DreameMapMowerMapManager:
     def __init__(self, _protocol: DreameMowerProtocol) -> None:
         self._map_list_object_name: str = None
@@ -178,7 +247,7 @@ class DreameMapMowerMapManager:
         self._need_map_request: bool = False
         self._need_map_list_request: bool = None
         self._need_recovery_map_list_request: bool = None
-        self._map_data_queue: dict[int, MapData] = {}
+        self._partial_map_queue: DreameMowerPartialMapQueue = DreameMowerPartialMapQueue()
         self._updated_frame_id: int = None
         self._selected_map_id: int = None
         self._request_queue: dict[str, bool] = {}
@@ -189,6 +258,7 @@ class DreameMapMowerMapManager:
         self._last_p_request_map_id: int = None
         self._last_p_request_frame_id: int = None
         self._last_p_request_time: int = None
+        self._last_p_request_count: int = 0
         self._last_robot_time: int = None
         self._map_request_time: int = None
         self._map_request_count: int = 0
@@ -352,26 +422,33 @@ class DreameMapMowerMapManager:
         return False
 
     def _request_missing_p_map(self) -> bool:
-        if self._map_data is None:
-            return
-
-        if self._partial_map_queue_size() == 0:
-            return
+        if self._map_data is None or self._current_frame_id is None:
+            return False
 
-        frame_id = self._current_frame_id + 1
         map_id = self._current_map_id
+        frame_id = self._partial_map_queue.missing_frame_id(map_id, self._current_frame_id + 1)
+        if frame_id is None:
+            return False
 
+        now = time.time()
         if (
             self._last_p_request_time is not None
             and self._last_p_request_map_id == map_id
             and self._last_p_request_frame_id == frame_id
-            and (time.time() - self._last_p_request_time) < 3
         ):
-            return
+            # Same gap is still open, retry with exponential backoff
+            if (now - self._last_p_request_time) < min(
+                MAP_MISSING_FRAME_REQUEST_INTERVAL * (2**self._last_p_request_count),
+                MAP_MISSING_FRAME_REQUEST_MAX_INTERVAL,
+            ):
+                return False
+            self._last_p_request_count = self._last_p_request_count + 1
+        else:
+            self._last_p_request_count = 0
 
         self._last_p_request_map_id = map_id
         self._last_p_request_frame_id = frame_id
-        self._last_p_request_time = time.time()
+        self._last_p_request_time = now
 
         _LOGGER.info("Request missing P map: %s", frame_id)
         result = self._request_map(
@@ -467,41 +544,21 @@ class DreameMapMowerMapManager:
         self.update()
         self.schedule_update(max(self._update_interval - (time.time() - start), 1))
 
-    def _queue_partial_map(self, map_data) -> None:
+    def _queue_partial_map(self, map_data) -> bool:
         if map_data.map_id != self._latest_map_id:
-            return
-        next_frame_id = 0
+            return False
 
+        next_frame_id = 0
         if self._current_map_id is not None and self._current_map_id == self._latest_map_id:
             next_frame_id = self._current_frame_id + 1
 
-        if map_data.map_id not in self._map_data_queue:
-            self._map_data_queue[map_data.map_id] = {}
-
         if map_data.frame_id < next_frame_id:
-            return
-        self._map_data_queue[map_data.map_id][map_data.frame_id] = map_data
-
-    def _delete_invalid_partial_maps(self) -> None:
-        if self._latest_map_id is None:
-            return
-
-        if self._current_frame_id is None:
-            return
-
-        frame_id = self._current_frame_id
-        map_data_queue = copy.deepcopy(self._map_data_queue)
-        for k, v in map_data_queue.items():
-            if k != self._latest_map_id:
-                del self._map_data_queue[k]
-
-        if self._latest_map_id not in self._map_data_queue or not self._map_data_queue[self._latest_map_id]:
-            return
+            return False
 
-        map_data_queue = copy.deepcopy(self._map_data_queue[self._latest_map_id])
-        for k, v in map_data_queue.items():
-            if k <= frame_id:
-                del self._map_data_queue[self._latest_map_id][k]
+        if not self._partial_map_queue.push(map_data):
+            _LOGGER.debug("Partial map queue is full, skip frame %s:%s", map_data.map_id, map_data.frame_id)
+            return False
+        return True
 
     def _unqueue_next_partial_map(self) -> MapData | None:
         if (
@@ -511,38 +568,35 @@ class DreameMapMowerMapManager:
         ):
             return
 
-        frame_id = self._current_frame_id + 1
-        if (
-            self._latest_map_id not in self._map_data_queue
-            or not self._map_data_queue[self._latest_map_id]
-            or frame_id not in self._map_data_queue[self._latest_map_id]
-        ):
-            return
-
-        map_data = self._map_data_queue[self._latest_map_id][frame_id]
+        return self._partial_map_queue.pop(self._latest_map_id, self._current_frame_id + 1)
 
-        if map_data:
-            del self._map_data_queue[self._latest_map_id][frame_id]
-            return map_data
+    def _delete_invalid_partial_maps(self) -> None:
+        if self._latest_map_id is None:
+            return
 
-    def _unqueue_partial_map(self, map_id: int, frame_id: int) -> MapData | None:
-        if (
-            map_id in self._map_data_queue
-            and self._map_data_queue[map_id]
-            and frame_id in self._map_data_queue[map_id]
-        ):
-            map_data = self._map_data_queue[map_id][frame_id]
-            del self._map_data_queue[map_id][frame_id]
-            return map_data
+        self._partial_map_queue.discard(
+            self._latest_map_id,
+            self._current_frame_id if self._current_map_id == self._latest_map_id else None,
+        )
 
     def _partial_map_queue_size(self) -> int:
         if self._latest_map_timestamp_ms is None:
             return 0
 
-        if self._latest_map_id not in self._map_data_queue or not self._map_data_queue[self._latest_map_id]:
-            return 0
+        self._delete_invalid_partial_maps()
+        return len(self._partial_map_queue)
 
-        return len(self._map_data_queue[self._latest_map_id])
+    def _request_partial_maps(self, next_frame_id: int = None) -> None:
+        queue_size = self._partial_map_queue_size()
+        if queue_size > MAP_PARTIAL_QUEUE_REQUEST_SIZE:
+            if self._protocol.dreame_cloud:
+                self._request_map()
+            else:
+                self.request_new_map()
+        elif queue_size > 4:
+            self._request_missing_p_map()
+        elif queue_size > 0 and next_frame_id is not None:
+            self._request_next_p_map(self._latest_map_id, next_frame_id)
 
     def _get_object_file_data(self, object_name: str = "", timestamp=None) -> Tuple[Any, Optional[str]]:
         key = None
@@ -632,21 +686,8 @@ class DreameMapMowerMapManager:
         if self._current_frame_id:
             next_frame_id = self._current_frame_id + 1
 
-        if (
-            not self._add_map_data(self._unqueue_partial_map(self._latest_map_id, next_frame_id))
-            and object_name is None
-        ):
-            self._delete_invalid_partial_maps()
-            tmpLen = self._partial_map_queue_size()
-            if tmpLen > 8:
-                if self._protocol.dreame_cloud:
-                    self._request_map()
-                else:
-                    self.request_new_map()
-            elif tmpLen > 4:
-                self._request_missing_p_map()
-            elif tmpLen > 0 and partial_map_data and len(partial_map_data) > 0:
-                self._request_next_p_map(self._latest_map_id, next_frame_id)
+        if not self._add_map_data(self._unqueue_next_partial_map()) and object_name is None:
+            self._request_partial_maps(next_frame_id if partial_map_data else None)
 
         if object_name is not None:
             _LOGGER.info("New object name received: %s", object_name)
@@ -661,13 +702,11 @@ class DreameMapMowerMapManager:
                     next_partial_map = self._unqueue_next_partial_map()
                     if next_partial_map:
                         self._add_map_data(next_partial_map)
-                    else:
-                        self._delete_invalid_partial_maps()
-                        if self._partial_map_queue_size() > 8:
-                            if self._protocol.dreame_cloud:
-                                self._request_map()
-                            else:
-                                self.request_new_map()
+                    elif self._partial_map_queue_size() > MAP_PARTIAL_QUEUE_REQUEST_SIZE:
+                        if self._protocol.dreame_cloud:
+                            self._request_map()
+                        else:
+                            self.request_new_map()
 
     def _add_map_data_file(self, object_name: str, timestamp) -> None:
         response, key = self._get_object_file_data(object_name, timestamp)
@@ -677,10 +716,21 @@ class DreameMapMowerMapManager:
     def _add_raw_map_data(self, raw_map: str, timestamp=None, key=None) -> bool:
         return self._add_map_data(self._decode_map_partial(raw_map, timestamp, key))
 
-    def _add_map_data(self, partial_map: MapDataPartial) -> None:
+    def _add_map_data(self, partial_map: MapDataPartial) -> bool:
         if partial_map is None:
             return False
 
+        result = self._apply_map_data(partial_map)
+
+        # Drain queued frames iteratively instead of recursing for every consecutive frame
+        next_partial_map = self._unqueue_next_partial_map()
+        while next_partial_map is not None:
+            _LOGGER.debug("Continue to next map data")
+            self._apply_map_data(next_partial_map)
+            next_partial_map = self._unqueue_next_partial_map()
+        return result
+
+    def _apply_map_data(self, partial_map: MapDataPartial) -> bool:
         if (
             partial_map.timestamp_ms is not None
             and self._current_timestamp_ms is not None
@@ -715,7 +765,6 @@ class DreameMapMowerMapManager:
                 partial_map.map_id,
                 self._latest_map_id,
             )
-            # self._add_next_map_data()
             return True
 
         if (
@@ -734,7 +783,6 @@ class DreameMapMowerMapManager:
                     self._current_map_id,
                     self._current_frame_id,
                 )
-                # self._add_next_map_data()
                 return True
 
         if partial_map.frame_type == MapFrameType.P.value:
@@ -749,32 +797,17 @@ class DreameMapMowerMapManager:
 
                 if self._map_request_time is None:
                     self._request_i_map()
-                    return True
+                return True
 
             if partial_map.frame_id != self._current_frame_id + 1:
                 if partial_map.frame_id <= self._current_frame_id:
-                    self._add_next_map_data()
                     return True
 
                 self._queue_partial_map(partial_map)
-                self._delete_invalid_partial_maps()
-
-                tmpLen = self._partial_map_queue_size()
-                if tmpLen > 0:
-                    if self._protocol.dreame_cloud:
-                        if tmpLen > 8:
-                            self._request_map()
-                        elif tmpLen > 4:
-                            self._request_missing_p_map()
-                        else:
-                            next_frame_id = 1
-                            if self._current_frame_id:
-                                next_frame_id = self._current_frame_id + 1
-                            self._request_next_p_map(self._latest_map_id, next_frame_id)
-                    else:
-                        self._request_next_p_map(partial_map.map_id, self._current_frame_id + 1)
-                else:
-                    self._add_next_map_data()
+                if self._protocol.dreame_cloud:
+                    self._request_partial_maps(self._current_frame_id + 1)
+                elif self._partial_map_queue_size() > 0:
+                    self._request_next_p_map(partial_map.map_id, self._current_frame_id + 1)
                 return True
 
             current_robot_position = (
@@ -808,7 +841,6 @@ class DreameMapMowerMapManager:
                 saved_map_data,
             ) = DreameMowerMapDecoder.decode_map_data_from_partial(partial_map, self._vslam_map)
             if map_data is None:
-                self._add_next_map_data()
                 return True
 
             if map_data.empty_map:
@@ -820,7 +852,6 @@ class DreameMapMowerMapManager:
                     self._current_timestamp_ms = map_data.timestamp_ms
 
                     self._map_data_changed()
-                self._add_next_map_data()
                 return True
 
             if saved_map_data is not None and saved_map_data.saved_map:
@@ -961,15 +992,8 @@ class DreameMapMowerMapManager:
             self._map_data = None
             self._map_data_changed()
 
-        self._add_next_map_data()
         return True
 
-    def _add_next_map_data(self) -> None:
-        next_partial_map = self._unqueue_next_partial_map()
-        if next_partial_map is not None:
-            _LOGGER.debug("Continue to next map data")
-            self._add_map_data(next_partial_map)
-
     def _refresh_map_list(self) -> None:
         index = 1
         new_map_list = []
@@ -1069,8 +1093,6 @@ class DreameMapMowerMapManager:
                     if response:
                         response = self._protocol.cloud.get_file(response)
                         if response:
-                            response = base64.b64encode(response).decode("utf-8")
-
                             cipher = Cipher(
                                 algorithms.AES(
                                     bytearray.fromhex(hashlib.md5((obstacle.key).encode("utf-8")).hexdigest())
@@ -1082,10 +1104,7 @@ class DreameMapMowerMapManager:
                             unpadder = padding.PKCS7(128).unpadder()
                             return (
                                 (
-                                    unpadder.update(
-                                        decryptor.update(base64.b64decode(response[response.find(",") + 1 :]))
-                                        + decryptor.finalize()
-                                    )
+                                    unpadder.update(decryptor.update(response) + decryptor.finalize())
                                     + unpadder.finalize()
                                 ),
                                 obstacle,
@@ -1831,23 +1850,15 @@ class DreameMapMowerMapEditor:
         if saved_map_data and map_id in saved_map_data and len(segments) == 2:
             map_data = saved_map_data[map_id]
             if map_data.segments and segments[0] in map_data.segments and segments[1] in map_data.segments:
-                if segments[1] not in map_data.segments[segments[0]].neighbors:
+                DreameMowerMapDecoder.update_segment_neighbors(map_data)
+                if segments[1] not in map_data.segment_neighbors[segments[0]]:
                     _LOGGER.error("Segments are not neighbors with each other: %s", segments)
                     return
 
-                data = np.zeros((map_data.dimensions.width * map_data.dimensions.height), np.uint8)
-                for y in range(map_data.dimensions.height):
-                    for x in range(map_data.dimensions.width):
-                        index = y * map_data.dimensions.width + x
-                        if (map_data.data[index] & 0x3F) == segments[1]:
-                            data[index] = segments[0]
-                        else:
-                            data[index] = map_data.data[index]
-
-                        if int(map_data.pixel_type[x, y]) == segments[1]:
-                            map_data.pixel_type[x, y] = segments[0]
-
-                map_data.data = bytes(data)
+                size = map_data.dimensions.width * map_data.dimensions.height
+                data = np.frombuffer(map_data.data, dtype=np.uint8)[:size]
+                map_data.data = np.where((data & 0x3F) == segments[1], np.uint8(segments[0]), data).tobytes()
+                map_data.pixel_type[map_data.pixel_type == segments[1]] = segments[0]
                 del self.map_manager._saved_map_data[map_id].segments[segments[1]]
                 new_segments = DreameMowerMapDecoder.get_segments(map_data, self.map_manager._vslam_map)
                 map_data.segments[segments[0]].x = new_segments[segments[0]].x
@@ -1856,10 +1867,7 @@ class DreameMapMowerMapEditor:
                     map_data.hidden_segments.remove(segments[1])
 
                 DreameMowerMapDecoder.set_floor_material(map_data)
-                for k, v in map_data.segments.items():
-                    if segments[1] in v.neighbors:
-                        map_data.segments[k].neighbors.remove(segments[1])
-
+                DreameMowerMapDecoder.merge_segment_neighbors(map_data, segments[0], segments[1])
                 DreameMowerMapDecoder.set_segment_color_index(map_data)
                 if self._map_data and map_id == self._selected_map_id:
                     self.set_current_map(map_id)
@@ -2293,40 +2301,74 @@ class DreameMapMowerMapEditor:
 
 class DreameMowerMapDecoder:
     HEADER_SIZE = 27
+    # map_id, frame_id, frame_type, robot x, y, angle, charger x, y, angle, grid_size, width, height, left, top
+    HEADER = struct.Struct("<hhb11h")
 
     @staticmethod
-    def _read_int_8(data: bytes, offset: int = 0) -> int:
-        return int.from_bytes(data[offset : offset + 1], byteorder="big", signed=True)
-
-    @staticmethod
-    def _read_int_8_le(data: bytes, offset: int = 0) -> int:
-        return int.from_bytes(data[offset : offset + 1], byteorder="little", signed=True)
-
-    @staticmethod
-    def _read_int_16(data: bytes, offset: int = 0) -> int:
-        return int.from_bytes(data[offset : offset + 2], byteorder="big", signed=True)
-
-    @staticmethod
-    def _read_int_16_le(data: bytes, offset: int = 0) -> int:
-        return int.from_bytes(data[offset : offset + 2], byteorder="little", signed=True)
-
-    @staticmethod
-    def _compare_segment_neighbors(r1: Segment, r2: Segment) -> bool:
-        alen = 0
-        blen = 0
-        if r1.neighbors:
-            alen = len(r1.neighbors)
-        if r2.neighbors:
-            blen = len(r2.neighbors)
-
-        if alen == blen:
-            return r1.segment_id - r2.segment_id
-
-        return blen - alen
+    @lru_cache(maxsize=8)
+    def _map_data_cipher(key: str, iv: str) -> Cipher:
+        return Cipher(
+            algorithms.AES(hashlib.sha256(key.encode()).hexdigest()[0:32].encode("utf8")),
+            modes.CBC(iv.encode("utf8")),
+            backend=default_backend(),
+        )
 
     @staticmethod
-    def _compare_colors(c1: list[int], c2: list[int]) -> bool:
-        return c1[1] - c2[1] if c1[1] != c2[1] else c1[0] - c2[0]
+    def decode_path(path: str) -> list[Path]:
+        """Decode the tr path string that consists of an operator and x,y coordinates for each point.
+        L points are relative to the previous point, all others are absolute."""
+        data = np.frombuffer(path.encode("utf8"), dtype=np.uint8)
+        digits = (data >= 48) & (data <= 57)
+        starts = np.flatnonzero(digits & ~np.concatenate(([False], digits[:-1])))
+        ends = np.flatnonzero(digits & ~np.concatenate((digits[1:], [False]))) + 1
+        operators = np.flatnonzero(np.isin(data, np.frombuffer(b"MWSLl", dtype=np.uint8)))
+        signs = (data[np.maximum(starts - 1, 0)] == 45) & (starts > 0)
+        number_starts = starts - signs
+
+        # Fall back to matching the points one by one if the string is not only made of points in the expected format
+        if (
+            len(starts) != len(operators) * 2
+            or len(starts) == 0
+            or (ends - starts).max() > 18
+            or np.count_nonzero(digits) + np.count_nonzero(signs) + len(operators) * 2 != len(data)
+            or not np.array_equal(number_starts[0::2] - 1, operators)
+            or not np.array_equal(number_starts[1::2] - 1, ends[0::2])
+            or np.any(data[ends[0::2]] != 44)
+            or not np.array_equal(ends[1::2][:-1], operators[1:])
+        ):
+            operators = []
+            x = []
+            y = []
+            for m in re.finditer(r"([MWSLl])(-?\d+),(-?\d+)", path):
+                operators.append(ord(m[1]))
+                x.append(int(m[2]))
+                y.append(int(m[3]))
+            operators = np.array(operators, dtype=np.uint8)
+            x = np.array(x, dtype=np.int64)
+            y = np.array(y, dtype=np.int64)
+        else:
+            lengths = ends - starts
+            indexes = np.flatnonzero(digits)
+            exponents = np.repeat(ends, lengths) - 1 - indexes
+            numbers = np.add.reduceat((data[indexes] - 48).astype(np.int64) * 10**exponents, lengths.cumsum() - lengths)
+            numbers[signs] = -numbers[signs]
+            operators = data[operators]
+            x = numbers[0::2]
+            y = numbers[1::2]
+
+        # Relative points are accumulated from the last absolute point, or from the origin before the first one
+        relative = operators == ord("L")
+        groups = np.cumsum(~relative)
+        x_offset = np.cumsum(np.where(relative, x, 0))
+        y_offset = np.cumsum(np.where(relative, y, 0))
+        absolute = np.flatnonzero(~relative)
+        x = x_offset + np.concatenate(([0], x[absolute] - x_offset[absolute]))[groups]
+        y = y_offset + np.concatenate(([0], y[absolute] - y_offset[absolute]))[groups]
+
+        # You will only get "l" paths with in a P frame.
+        # It means path is connected with the path from previous frame and it should be rendered as a line.
+        path_types = {o: PathType("L" if o == "l" else o) for o in set(operators.tobytes().decode("utf8"))}
+        return list(map(Path, x.tolist(), y.tolist(), [path_types[o] for o in operators.tobytes().decode("utf8")]))
 
     @staticmethod
     def _get_pixel_type(map_data: MapData, pixel, vslam_map: bool = False) -> MapPixelType:
@@ -2382,49 +2424,24 @@ class DreameMowerMapDecoder:
     @staticmethod
     def _get_segment_center(map_data, segment_id: int, center: int, vertical: bool) -> int | None:
         # Find center point implemented as on the app
-        lines = []
-        zero_pixels = -1
-        segment_pixel = 0
-        line = None
-
-        for k in range(map_data.dimensions.height if vertical else map_data.dimensions.width):
-            pixel_type = (
-                map_data.data[
-                    (k * map_data.dimensions.width + center) if vertical else (center * map_data.dimensions.width + k)
-                ]
-                & 0x3F
-            )
-            if pixel_type == segment_id:
-                segment_pixel = k
-                zero_pixels = 0
-                if line is None:
-                    line = [segment_pixel]
-            elif pixel_type == 0:
-                if zero_pixels >= 0:
-                    zero_pixels = zero_pixels + 1
-                    if zero_pixels >= 4 and line is not None:
-                        line.append(segment_pixel)
-                        lines.append(line)
-                        line = None
-            elif line is not None:
-                line.append(segment_pixel)
-                lines.append(line)
-                line = None
-
-        if line is not None:
-            line.append(segment_pixel)
-            lines.append(line)
-            line = None
-
-        if lines:
-            maxLine = lines[0]
-            if len(lines) > 1:
-                for item in lines[1:]:
-                    if item[1] - item[0] > maxLine[1] - maxLine[0]:
-                        maxLine = item
-
-            return int(math.ceil((maxLine[1] - maxLine[0]) / 2 + maxLine[0]))
-        return None
+        width = map_data.dimensions.width
+        data = np.frombuffer(map_data.data, dtype=np.uint8)
+        if vertical:
+            line = data[center : map_data.dimensions.height * width : width] & 0x3F
+        else:
+            line = data[center * width : (center + 1) * width] & 0x3F
+
+        segment_pixels = np.flatnonzero(line == segment_id)
+        if not len(segment_pixels):
+            return None
+
+        # A line of segment pixels ends at a pixel of another type or at four consecutive empty pixels
+        other_pixels = np.cumsum((line != segment_id) & (line != 0))
+        breaks = np.flatnonzero((np.diff(segment_pixels) > 4) | (np.diff(other_pixels[segment_pixels]) > 0))
+        starts = segment_pixels[np.concatenate(([0], breaks + 1))]
+        ends = segment_pixels[np.concatenate((breaks, [len(segment_pixels) - 1]))]
+        i = int(np.argmax(ends - starts))
+        return int(math.ceil((ends[i] - starts[i]) / 2 + starts[i]))
 
     @staticmethod
     def decode_map_partial(raw_map, iv=None, key=None) -> MapDataPartial | None:
@@ -2445,13 +2462,11 @@ class DreameMowerMapDecoder:
             if iv is None:
                 iv = ""
             try:
-                cipher = Cipher(
-                    algorithms.AES(hashlib.sha256(key.encode()).hexdigest()[0:32].encode("utf8")),
-                    modes.CBC(iv.encode("utf8")),
-                    backend=default_backend(),
-                )
-                decryptor = cipher.decryptor()
-                raw_map = decryptor.update(raw_map) + decryptor.finalize()
+                decryptor = DreameMowerMapDecoder._map_data_cipher(key, iv).decryptor()
+                raw_map = decryptor.update(raw_map)
+                remaining = decryptor.finalize()
+                if remaining:
+                    raw_map = raw_map + remaining
             except Exception as ex:
                 _LOGGER.error(
                     f"Map data decryption failed: {ex}. Private key might be missing, please report this issue with your device model https://github.com/Tasshack/dreame-mower/issues/new?assignees=Tasshack&labels=bug&template=bug_report.md&title=Map%20data%20decryption%20failed"
@@ -2459,25 +2474,42 @@ class DreameMowerMapDecoder:
                 return None
 
         try:
-            raw_map = zlib.decompress(raw_map)
-            if not raw_map or len(raw_map) < DreameMowerMapDecoder.HEADER_SIZE:
+            # Inflate the header first and bound the rest of the payload by the image size it declares
+            decompressor = zlib.decompressobj()
+            header = decompressor.decompress(raw_map, DreameMowerMapDecoder.HEADER_SIZE)
+            if len(header) < DreameMowerMapDecoder.HEADER_SIZE:
                 _LOGGER.error("Wrong header size for map")
                 return None
+
+            width, height = DreameMowerMapDecoder.HEADER.unpack(header)[10:12]
+            if width < 0 or height < 0 or width * height > MAP_DECOMPRESSED_MAX_AREA:
+                _LOGGER.error("Wrong image size for map: %sx%s", width, height)
+                return None
+
+            max_size = width * height + MAP_DECOMPRESSED_JSON_MAX_SIZE
+            raw_map = header + decompressor.decompress(decompressor.unconsumed_tail, max_size)
+            if not decompressor.eof:
+                # Input is left over only when the output limit is reached before the end of the stream
+                if decompressor.unconsumed_tail:
+                    _LOGGER.error(
+                        "Map data exceeds the maximum size of %s bytes", DreameMowerMapDecoder.HEADER_SIZE + max_size
+                    )
+                else:
+                    _LOGGER.error("Map data decompression failed: incomplete or truncated stream")
+                return None
         except Exception as ex:
             _LOGGER.error("Map data decompression failed: %s", ex)
             return None
 
         partial_map = MapDataPartial()
-        partial_map.map_id = DreameMowerMapDecoder._read_int_16_le(raw_map)
-        partial_map.frame_id = DreameMowerMapDecoder._read_int_16_le(raw_map, 2)
-        partial_map.frame_type = DreameMowerMapDecoder._read_int_8(raw_map, 4)
+        partial_map.header = DreameMowerMapDecoder.HEADER.unpack_from(raw_map)
+        partial_map.map_id, partial_map.frame_id, partial_map.frame_type = partial_map.header[:3]
         partial_map.raw = raw_map
-        image_size = DreameMowerMapDecoder.HEADER_SIZE + (
-            DreameMowerMapDecoder._read_int_16_le(raw_map, 19) * DreameMowerMapDecoder._read_int_16_le(raw_map, 21)
-        )
+        image_size = DreameMowerMapDecoder.HEADER_SIZE + partial_map.header[10] * partial_map.header[11]
         if len(raw_map) >= image_size:
             try:
-                data_json = json.loads(raw_map[image_size:].decode("utf8"))
+                # Decode the json trailer without copying it out of the decompressed buffer first
+                data_json = json.loads(str(memoryview(raw_map)[image_size:], "utf8"))
                 if data_json.get("timestamp_ms"):
                     partial_map.timestamp_ms = int(data_json["timestamp_ms"])
 
@@ -2504,6 +2536,18 @@ class DreameMowerMapDecoder:
     def decode_saved_map(raw_map: str, vslam_map: bool, rotation: int = 0, iv: str = None) -> MapData | None:
         return DreameMowerMapDecoder.decode_map(raw_map, vslam_map, rotation, iv)[0]
 
+    @staticmethod
+    def decode_embedded_map(raw_map: str, vslam_map: bool, rotation: int = 0) -> MapData | None:
+        """Decode the saved or wifi map embedded in a map frame. Consecutive frames carry the same embedded map,
+        decoded maps are cached by their content and a copy is returned because callers modify it."""
+        map_data = DreameMowerMapDecoder._decode_embedded_map(raw_map, vslam_map, rotation)
+        return copy.deepcopy(map_data) if map_data is not None else None
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _decode_embedded_map(raw_map: str, vslam_map: bool, rotation: int) -> MapData | None:
+        return DreameMowerMapDecoder.decode_saved_map(raw_map, vslam_map, rotation)
+
     @staticmethod
     def decode_map_data_from_partial(
         partial_map: MapDataPartial, vslam_map: bool, rotation: int = 0
@@ -2518,22 +2562,12 @@ class DreameMowerMapDecoder:
         map_data.timestamp_ms = partial_map.timestamp_ms
 
         raw = partial_map.raw
-        map_data.robot_position = Point(
-            DreameMowerMapDecoder._read_int_16_le(raw, 5),
-            DreameMowerMapDecoder._read_int_16_le(raw, 7),
-            DreameMowerMapDecoder._read_int_16_le(raw, 9),
-        )
-        map_data.charger_position = Point(
-            DreameMowerMapDecoder._read_int_16_le(raw, 11),
-            DreameMowerMapDecoder._read_int_16_le(raw, 13),
-            DreameMowerMapDecoder._read_int_16_le(raw, 15),
-        )
-
-        grid_size = DreameMowerMapDecoder._read_int_16_le(raw, 17)
-        width = DreameMowerMapDecoder._read_int_16_le(raw, 19)
-        height = DreameMowerMapDecoder._read_int_16_le(raw, 21)
-        left = DreameMowerMapDecoder._read_int_16_le(raw, 23)
-        top = DreameMowerMapDecoder._read_int_16_le(raw, 25)
+        header = partial_map.header
+        if header is None:
+            header = DreameMowerMapDecoder.HEADER.unpack_from(raw)
+        map_data.robot_position = Point(header[3], header[4], header[5])
+        map_data.charger_position = Point(header[6], header[7], header[8])
+        grid_size, width, height, left, top = header[9:]
 
         image_size = DreameMowerMapDecoder.HEADER_SIZE + width * height
         data_json = partial_map.data_json
@@ -2618,33 +2652,7 @@ class DreameMowerMapDecoder:
                     map_data.index = 0
 
                 if data_json.get("tr"):
-                    matches = [
-                        m.groupdict()
-                        for m in re.compile(r"(?P<operator>[MWSLl])(?P<x>-?\d+),(?P<y>-?\d+)").finditer(
-                            data_json["tr"]
-                        )
-                    ]
-                    current_position = Point(0, 0)
-                    map_data.path = []
-                    for match in matches:
-                        operator = match["operator"]
-                        x = int(match["x"])
-                        y = int(match["y"])
-
-                        if operator == "L":
-                            current_position = Path(
-                                current_position.x + x,
-                                current_position.y + y,
-                                PathType.LINE,
-                            )
-                        else:
-                            # You will only get "l" paths with in a P frame.
-                            # It means path is connected with the path from previous frame and it should be rendered as a line.
-                            if operator == "l":
-                                operator = "L"
-                            current_position = Path(x, y, PathType(operator))
-
-                        map_data.path.append(current_position)
+                    map_data.path = DreameMowerMapDecoder.decode_path(data_json["tr"])
 
                 if data_json.get("sa") and isinstance(data_json["sa"], list):
                     map_data.active_segments = [sa[0] for sa in data_json["sa"]]
@@ -2689,93 +2697,83 @@ class DreameMowerMapDecoder:
             )
             if (width * height) > 0:
                 map_data.data = raw[DreameMowerMapDecoder.HEADER_SIZE : image_size]
+                # Pixels in row order, read directly from the decompressed buffer
+                pixels = np.frombuffer(
+                    raw, dtype=np.uint8, count=width * height, offset=DreameMowerMapDecoder.HEADER_SIZE
+                )
                 map_data.empty_map = bool(width == 2 and height == 2)
                 if map_data.empty_map:
-                    for y in range(height):
-                        for x in range(width):
-                            if map_data.data[(width * y) + x] > 0:
-                                map_data.empty_map = False
-                                break
+                    map_data.empty_map = not pixels.any()
 
                 map_data.pixel_type = np.full((width, height), MapPixelType.OUTSIDE.value, dtype=np.uint8)
                 if not map_data.empty_map:
                     map_data.empty_map = True
                     if map_data.frame_type == MapFrameType.W.value:
-                        try:
-                            for y in range(height):
-                                for x in range(width):
-                                    pixel = map_data.data[(width * y) + x] & 15
-                                    if pixel > 0:
-                                        map_data.empty_map = False
-                                        map_data.pixel_type[x, y] = MapPixelType(pixel)
-                        except:
-                            pass
+                        pixel = pixels & 15
+                        # Decoding stops at the first pixel that is not a valid pixel type
+                        invalid = np.flatnonzero((pixel > 0) & ~np.isin(pixel, list(MapPixelType._value2member_map_)))
+                        end = int(invalid[0]) if len(invalid) else len(pixel)
+                        map_data.empty_map = not pixel[: end + 1].any()
+                        pixel[end:] = MapPixelType.OUTSIDE.value
+                        map_data.pixel_type = np.ascontiguousarray(pixel.reshape(height, width).T)
                     elif map_data.frame_type == MapFrameType.I.value:
                         if map_data.frame_map:
-                            for y in range(height):
-                                for x in range(width):
-                                    pixel = map_data.data[(width * y) + x]
-                                    if pixel > 0:
-                                        map_data.empty_map = False
-                                        segment_id = pixel >> 2
-                                        if 0 < segment_id < 64:
-                                            if segment_id == 63:
-                                                map_data.pixel_type[x, y] = MapPixelType.WALL.value
-                                            elif segment_id == 62:
-                                                map_data.pixel_type[x, y] = MapPixelType.FLOOR.value
-                                            elif segment_id == 61:
-                                                map_data.pixel_type[x, y] = MapPixelType.UNKNOWN.value
-                                            else:
-                                                map_data.pixel_type[x, y] = segment_id
-                                        else:
-                                            segment_id = pixel & 0x3F
-                                            if segment_id == 1 or segment_id == 3:
-                                                map_data.pixel_type[x, y] = MapPixelType.NEW_SEGMENT.value
-                                            elif segment_id == 2:
-                                                map_data.pixel_type[x, y] = MapPixelType.WALL.value
+                            segment_id = pixels >> 2
+                            map_data.empty_map = not pixels.any()
+                            pixel_type = np.select(
+                                [
+                                    segment_id == 63,
+                                    segment_id == 62,
+                                    segment_id == 61,
+                                    segment_id > 0,
+                                    (pixels == 1) | (pixels == 3),
+                                    pixels == 2,
+                                ],
+                                [
+                                    np.uint8(MapPixelType.WALL.value),
+                                    np.uint8(MapPixelType.FLOOR.value),
+                                    np.uint8(MapPixelType.UNKNOWN.value),
+                                    segment_id,
+                                    np.uint8(MapPixelType.NEW_SEGMENT.value),
+                                    np.uint8(MapPixelType.WALL.value),
+                                ],
+                                np.uint8(MapPixelType.OUTSIDE.value),
+                            )
                         elif map_data.saved_map_status == 1 or map_data.saved_map_status == 0:
-                            for y in range(height):
-                                for x in range(width):
-                                    pixel = map_data.data[(width * y) + x]
-                                    if pixel > 0:
-                                        segment_id = pixel & 0x3F
-                                        # as implemented on the app
-                                        if segment_id == 1 or segment_id == 3:
-                                            map_data.empty_map = False
-                                            map_data.pixel_type[x, y] = MapPixelType.NEW_SEGMENT.value
-                                        elif segment_id == 2:
-                                            map_data.empty_map = False
-                                            map_data.pixel_type[x, y] = MapPixelType.WALL.value
+                            segment_id = pixels & 0x3F
+                            # as implemented on the app
+                            pixel_type = np.select(
+                                [(segment_id == 1) | (segment_id == 3), segment_id == 2],
+                                [MapPixelType.NEW_SEGMENT.value, MapPixelType.WALL.value],
+                                MapPixelType.OUTSIDE.value,
+                            ).astype(np.uint8)
+                            map_data.empty_map = not pixel_type.any()
                         elif (
                             vslam_map and not map_data.saved_map and not map_data.recovery_map
                         ) or map_data.saved_map_status == 2:
-                            for y in range(height):
-                                for x in range(width):
-                                    segment_id = map_data.data[(width * y) + x] & 0x3F
-                                    if segment_id > 0:
-                                        map_data.empty_map = False
-                                        if segment_id == 2:
-                                            map_data.pixel_type[x, y] = MapPixelType.WALL.value
-                                        else:
-                                            map_data.pixel_type[x, y] = MapPixelType.NEW_SEGMENT.value
+                            segment_id = pixels & 0x3F
+                            pixel_type = np.select(
+                                [segment_id == 2, segment_id > 0],
+                                [MapPixelType.WALL.value, MapPixelType.NEW_SEGMENT.value],
+                                MapPixelType.OUTSIDE.value,
+                            ).astype(np.uint8)
+                            map_data.empty_map = not pixel_type.any()
                         else:
-                            for y in range(height):
-                                for x in range(width):
-                                    pixel = map_data.data[(width * y) + x]
-                                    if pixel > 0:
-                                        map_data.empty_map = False
-                                        segment_id = pixel & 0x3F
-                                        if pixel >> 7:
-                                            map_data.pixel_type[x, y] = (
-                                                MapPixelType.HIDDEN_WALL.value
-                                                if map_data.hidden_segments
-                                                and segment_id
-                                                and segment_id in map_data.hidden_segments
-                                                else MapPixelType.WALL.value
-                                            )
-                                        else:
-                                            if segment_id > 0:
-                                                map_data.pixel_type[x, y] = segment_id
+                            segment_id = pixels & 0x3F
+                            walls = (pixels >> 7) > 0
+                            hidden_walls = (
+                                walls & (segment_id > 0) & np.isin(segment_id, map_data.hidden_segments)
+                                if map_data.hidden_segments
+                                else np.zeros_like(walls)
+                            )
+                            map_data.empty_map = not pixels.any()
+                            pixel_type = np.where(
+                                hidden_walls,
+                                np.uint8(MapPixelType.HIDDEN_WALL.value),
+                                np.where(walls, np.uint8(MapPixelType.WALL.value), segment_id),
+                            )
+
+                        map_data.pixel_type = np.ascontiguousarray(pixel_type.reshape(height, width).T)
 
                         segments = DreameMowerMapDecoder.get_segments(map_data, vslam_map)
                         if segments and "seg_inf" in data_json:
@@ -2826,14 +2824,14 @@ class DreameMowerMapDecoder:
 
             wifi_map = data_json.get("whm")
             if map_data.saved_map and wifi_map and len(wifi_map) > 1:
-                wifi_map_data = DreameMowerMapDecoder.decode_saved_map(data_json["whm"], False, map_data.rotation)
+                wifi_map_data = DreameMowerMapDecoder.decode_embedded_map(data_json["whm"], False, map_data.rotation)
                 if wifi_map_data:
                     map_data.wifi_map_data = wifi_map_data
                     if map_data.wifi_map_data.router_position is None:
                         map_data.wifi_map_data.router_position = map_data.router_position
 
             if "rism" in data_json:
-                saved_map_data = DreameMowerMapDecoder.decode_saved_map(
+                saved_map_data = DreameMowerMapDecoder.decode_embedded_map(
                     data_json["rism"],
                     vslam_map,
                     map_data.rotation,
@@ -2894,32 +2892,35 @@ class DreameMowerMapDecoder:
                             nj = int((map_data.dimensions.top - top) / map_data.dimensions.grid_size)
                             nim = ni + map_data.dimensions.width
                             njm = nj + map_data.dimensions.height
-                            pixel_type = np.zeros((width, height), np.uint8)
-
-                            for j in range(height):
-                                for i in range(width):
-                                    if j >= sj and i >= si and j < sjm and i < sim:
-                                        saved_value = saved_map_data.data[
-                                            (i - si) + ((j - sj) * saved_map_data.dimensions.width)
-                                        ]
-                                        segment_id = saved_value & 0x3F
-                                    else:
-                                        saved_value = -1
-                                        segment_id = 0
-
-                                    if map_data.restored_map and segment_id and saved_value != -1:
-                                        if saved_value >> 7 == 1:
-                                            pixel_type[i, j] = 255
-                                        elif saved_value == 63:
-                                            pixel_type[i, j] = 253
-                                        else:
-                                            pixel_type[i, j] = segment_id
-                                    elif j >= nj and i >= ni and j < njm and i < nim:
-                                        clean_value = int(map_data.pixel_type[(i - ni), ((j - nj))])
-                                        if clean_value == 255:
-                                            pixel_type[i, j] = clean_value
-                                        elif clean_value == 253:
-                                            pixel_type[i, j] = segment_id if segment_id else 254
+
+                            # Saved map pixels and current map pixel types placed on the combined grid,
+                            # -1 and 0 are used for the area outside of them
+                            saved_value = np.full((width, height), -1, dtype=np.int16)
+                            region = saved_value[si:sim, sj:sjm]
+                            region[:] = np.frombuffer(
+                                saved_map_data.data,
+                                dtype=np.uint8,
+                                count=saved_map_data.dimensions.width * saved_map_data.dimensions.height,
+                            ).reshape(saved_map_data.dimensions.height, saved_map_data.dimensions.width).T[
+                                : region.shape[0], : region.shape[1]
+                            ]
+                            clean_value = np.zeros((width, height), dtype=np.uint8)
+                            region = clean_value[ni:nim, nj:njm]
+                            region[:] = map_data.pixel_type[: region.shape[0], : region.shape[1]]
+
+                            segment_id = np.where(saved_value >= 0, saved_value & 0x3F, 0)
+                            restored = (segment_id > 0) if map_data.restored_map else np.zeros_like(segment_id, bool)
+                            pixel_type = np.select(
+                                [
+                                    restored & (saved_value >> 7 == 1),
+                                    restored & (saved_value == 63),
+                                    restored,
+                                    clean_value == 255,
+                                    clean_value == 253,
+                                ],
+                                [255, 253, segment_id, 255, np.where(segment_id > 0, segment_id, 254)],
+                                0,
+                            ).astype(np.uint8)
 
                             map_data.combined_pixel_type = pixel_type
                             map_data.combined_dimensions = MapImageDimensions(
@@ -3428,50 +3429,62 @@ class DreameMowerMapDecoder:
 
         cleaning_map.multiple_cleaning_time = map_data.multiple_cleaning_time
         if partial_cleaning_map:
-            grid_size = DreameMowerMapDecoder._read_int_16_le(partial_cleaning_map.raw, 17)
-            width = DreameMowerMapDecoder._read_int_16_le(partial_cleaning_map.raw, 19)
-            height = DreameMowerMapDecoder._read_int_16_le(partial_cleaning_map.raw, 21)
-            left = DreameMowerMapDecoder._read_int_16_le(partial_cleaning_map.raw, 23)
-            top = DreameMowerMapDecoder._read_int_16_le(partial_cleaning_map.raw, 25)
-
-            data = partial_cleaning_map.raw[
-                DreameMowerMapDecoder.HEADER_SIZE : DreameMowerMapDecoder.HEADER_SIZE + width * height
-            ]
-
-            for y in range(height):
-                for x in range(width):
-                    value = data[int(y * width + x)] & 3
-                    if value > 0:
-                        xx = int(((left + (x * grid_size)) - map_data.dimensions.left) / map_data.dimensions.grid_size)
-                        yy = int(((top + (y * grid_size)) - map_data.dimensions.top) / map_data.dimensions.grid_size)
-                        if cleaning_map.check_point(xx, yy, True):
-                            cleaning_map.pixel_type[xx, yy] = 249 - value
+            grid_size, width, height, left, top = DreameMowerMapDecoder.HEADER.unpack_from(partial_cleaning_map.raw)[9:]
 
-        cleaning_map.has_dirty_area = bool(MapPixelType.DIRTY_AREA.value in cleaning_map.pixel_type)
-        cleaning_map.has_cleaned_area = bool(MapPixelType.CLEAN_AREA.value in cleaning_map.pixel_type)
+            data = (
+                np.frombuffer(
+                    partial_cleaning_map.raw,
+                    dtype=np.uint8,
+                    count=width * height,
+                    offset=DreameMowerMapDecoder.HEADER_SIZE,
+                )
+                & 3
+            )
+            indexes = np.flatnonzero(data)
+            if len(indexes):
+                dimensions = map_data.dimensions
+                xx = np.trunc(((left + (indexes % width) * grid_size) - dimensions.left) / dimensions.grid_size)
+                yy = np.trunc(((top + (indexes // width) * grid_size) - dimensions.top) / dimensions.grid_size)
+                inside = (xx >= 0) & (xx < dimensions.width) & (yy >= 0) & (yy < dimensions.height)
+                xx = xx[inside].astype(np.intp)
+                yy = yy[inside].astype(np.intp)
+                values = data[indexes[inside]]
+
+                # Only segment pixels are marked, last pixel wins when multiple pixels fall into the same cell
+                pixels = cleaning_map.pixel_type[xx, yy]
+                valid = (pixels > 0) & (pixels != 255)
+                cells = (xx * dimensions.height + yy)[valid][::-1]
+                cells, last = np.unique(cells, return_index=True)
+                cleaning_map.pixel_type.ravel()[cells] = 249 - values[valid][::-1][last]
+
+        area_count = np.bincount(cleaning_map.pixel_type.ravel(), minlength=256)
+        cleaning_map.has_dirty_area = bool(area_count[MapPixelType.DIRTY_AREA.value])
+        cleaning_map.has_cleaned_area = bool(area_count[MapPixelType.CLEAN_AREA.value])
 
         return cleaning_map
 
     @staticmethod
     def get_segments(map_data: MapData, vslam_map: bool) -> dict[str, Any]:
         segments = {}
-        for y in range(map_data.dimensions.height):
-            for x in range(map_data.dimensions.width):
-                segment_id = int(map_data.pixel_type[x, y])
-                if segment_id > 0 and segment_id < 64:
-                    if segment_id not in segments:
-                        segments[segment_id] = Segment(segment_id, x, y, x, y)
-                        continue
-
-                    if x < segments[segment_id].x0:
-                        segments[segment_id].x0 = x
-                    elif x > segments[segment_id].x1:
-                        segments[segment_id].x1 = x
-
-                    if y < segments[segment_id].y0:
-                        segments[segment_id].y0 = y
-                    elif y > segments[segment_id].y1:
-                        segments[segment_id].y1 = y
+        width = map_data.dimensions.width
+        # Pixels in row order, segments are ordered by their first pixel
+        pixels = map_data.pixel_type.T.ravel()
+        indexes = np.flatnonzero((pixels > 0) & (pixels < 64))
+        if len(indexes):
+            values = pixels[indexes]
+            order = np.argsort(values, kind="stable")
+            indexes = indexes[order]
+            segment_ids, starts = np.unique(values[order], return_index=True)
+            x = indexes % width
+            y = indexes // width
+            min_x = np.minimum.reduceat(x, starts)
+            max_x = np.maximum.reduceat(x, starts)
+            max_y = np.maximum.reduceat(y, starts)
+            for i in np.argsort(indexes[starts], kind="stable"):
+                segment_id = int(segment_ids[i])
+                segments[segment_id] = Segment(
+                    segment_id, int(min_x[i]), int(y[starts[i]]), int(max_x[i]), int(max_y[i])
+                )
 
         if segments:
             for k, v in segments.items():
@@ -3481,18 +3494,11 @@ class DreameMowerMapDecoder:
                 if map_data.saved_map:
                     if vslam_map:
                         if map_data.pixel_type[x, y] != k:
-                            startI = -1
-                            endI = -1
-                            for i in range(map_data.dimensions.width):
-                                value = map_data.pixel_type[i, y]
-                                if startI == -1:
-                                    if value == k:
-                                        startI = i
-                                elif value != k or i == (map_data.dimensions.width - 1):
-                                    endI = i - 1
-                                    break
-
-                            if startI != -1 and endI != -1:
+                            row = map_data.pixel_type[:, y] == k
+                            startI = int(np.argmax(row))
+                            if row[startI] and startI < width - 1:
+                                ends = np.flatnonzero(~row[startI + 1 : width - 1])
+                                endI = startI + int(ends[0]) if len(ends) else width - 2
                                 x = (endI - startI) + startI
                     else:
                         center_x = DreameMowerMapDecoder._get_segment_center(map_data, k, y, False)
@@ -3594,41 +3600,100 @@ class DreameMowerMapDecoder:
                     map_data.segments[k].cleaning_mode = None
                     map_data.segments[k].cleaning_route = None
 
+    @staticmethod
+    def get_segment_neighbors(map_data: MapData) -> dict[int, list[int]]:
+        """Find segments touching each other on the pixel grid"""
+        neighbors = {k: [] for k in map_data.segments}
+        if map_data.pixel_type is not None:
+            edges = []
+            pixel_type = map_data.pixel_type.astype(np.int32)
+            for a, b in ((pixel_type[:-1, :], pixel_type[1:, :]), (pixel_type[:, :-1], pixel_type[:, 1:])):
+                mask = (a != b) & (a > 0) & (a < 64) & (b > 0) & (b < 64)
+                edges.append(a[mask] * 64 + b[mask])
+                edges.append(b[mask] * 64 + a[mask])
+            for edge in np.unique(np.concatenate(edges)).tolist():
+                segment_id, neighbor_id = divmod(edge, 64)
+                if segment_id in neighbors and neighbor_id in neighbors:
+                    neighbors[segment_id].append(neighbor_id)
+        return neighbors
+
+    @staticmethod
+    def _segment_neighbors_key(map_data: MapData) -> Any:
+        return (
+            map_data.map_id,
+            map_data.frame_id,
+            None if map_data.pixel_type is None else map_data.pixel_type.shape,
+            tuple((k, tuple(v.neighbors) if v.neighbors else ()) for k, v in map_data.segments.items())
+            if map_data.segments
+            else None,
+        )
+
+    @staticmethod
+    def set_segment_neighbors(map_data: MapData) -> None:
+        """Build segment adjacency graph from seg_inf.nei_id or from the pixel grid when it is missing or stale"""
+        map_data.segment_neighbors_key = DreameMowerMapDecoder._segment_neighbors_key(map_data)
+        segments = map_data.segments
+        if not segments:
+            map_data.segment_neighbors = None
+            return
+
+        # Neighbors received from the device are kept as is on the segments
+        neighbors = {k: list(v.neighbors) if v.neighbors else [] for k, v in segments.items()}
+        if not any(neighbors.values()) or any(
+            nid not in neighbors or k not in neighbors[nid] for k, v in neighbors.items() for nid in v
+        ):
+            neighbors = DreameMowerMapDecoder.get_segment_neighbors(map_data)
+        map_data.segment_neighbors = neighbors
+
+    @staticmethod
+    def update_segment_neighbors(map_data: MapData) -> None:
+        """Build segment adjacency graph again when segments, their neighbors or the map frame are changed"""
+        if (
+            map_data.segment_neighbors is None
+            or map_data.segment_neighbors_key != DreameMowerMapDecoder._segment_neighbors_key(map_data)
+        ):
+            DreameMowerMapDecoder.set_segment_neighbors(map_data)
+
+    @staticmethod
+    def merge_segment_neighbors(map_data: MapData, segment_id: int, merged_segment_id: int) -> None:
+        """Move the neighbors of the merged segment to the segment it is merged into"""
+        neighbors = map_data.segment_neighbors
+        if neighbors is None or segment_id not in neighbors:
+            return
+
+        for nid in neighbors.pop(merged_segment_id, []):
+            # Merged segment is also removed from the neighbors received from the device
+            segment = map_data.segments.get(nid)
+            if segment and segment.neighbors and merged_segment_id in segment.neighbors:
+                segment.neighbors.remove(merged_segment_id)
+            if nid in neighbors:
+                if merged_segment_id in neighbors[nid]:
+                    neighbors[nid].remove(merged_segment_id)
+                if nid != segment_id:
+                    if segment_id not in neighbors[nid]:
+                        neighbors[nid].append(segment_id)
+                    if nid not in neighbors[segment_id]:
+                        neighbors[segment_id].append(nid)
+        map_data.segment_neighbors_key = DreameMowerMapDecoder._segment_neighbors_key(map_data)
+
     @staticmethod
     def set_segment_color_index(map_data: MapData) -> None:
         """Find segment color index as implemented on the app"""
+        DreameMowerMapDecoder.update_segment_neighbors(map_data)
+
+        # Segments with more neighbors are colored first, each one gets the least used color that is free around it
+        neighbors = map_data.segment_neighbors
         area_color_index = {}
-        sorted_segments = sorted(
-            map_data.segments.values(),
-            key=cmp_to_key(DreameMowerMapDecoder._compare_segment_neighbors),
-        )
-        for segment in sorted_segments:
-            used_ids = []
-            if segment.neighbors is not None:
-                for nid in segment.neighbors:
-                    if nid in area_color_index:
-                        used_ids.append(area_color_index[nid])
-
-            area_color_num = {}
-            for i in range(4):
-                area_color_num[i] = [i, 0]
-
-            for i, j in area_color_index.items():
-                area_color_num[j][1] = area_color_num[j][1] + 1
-
-            area_color_num = sorted(
-                area_color_num.values(),
-                key=cmp_to_key(DreameMowerMapDecoder._compare_colors),
+        area_color_num = [0, 0, 0, 0]
+        for segment_id in sorted(neighbors, key=lambda k: (-len(neighbors[k]), k)):
+            used_ids = {area_color_index[nid] for nid in neighbors[segment_id] if nid in area_color_index}
+            color = min(
+                (i for i in range(4) if i not in used_ids),
+                key=lambda i: (area_color_num[i], i),
+                default=0,
             )
-
-            for area_color in area_color_num:
-                color = area_color[0]
-                if color not in used_ids:
-                    area_color_index[segment.segment_id] = color
-                    break
-
-            if segment.segment_id not in area_color_index:
-                area_color_index[segment.segment_id] = 0
+            area_color_num[color] = area_color_num[color] + 1
+            area_color_index[segment_id] = color
 
         for k, v in area_color_index.items():
             map_data.segments[k].color_index = v
@@ -3671,12 +3736,50 @@ class DreameMowerMapDecoder:
                 map_data.floor_material = floor_material
 
 
+class DreameMowerMapImageEncoder:
+    """PNG encoder that stores rendered map images as indexed images, exactly when all of their colors fit into a
+    palette and quantized to an adaptive palette otherwise."""
+
+    def __init__(self, palette: bool = True, compress_level: int = MAP_RENDERER_PNG_COMPRESS_LEVEL) -> None:
+        self.palette: bool = palette
+        self.compress_level: int = compress_level
+
+    def encode(self, image, pnginfo=None, exact: bool = True) -> bytes:
+        """Encode image, exact conversion is skipped for images known to have more colors than a palette can hold."""
+        buffer = io.BytesIO()
+        if self.palette and image.mode == "RGBA":
+            indexed = self.to_indexed(image) if exact else None
+            image = indexed if indexed is not None else self.quantize(image)
+        image.save(buffer, format="PNG", compress_level=self.compress_level, pnginfo=pnginfo)
+        return buffer.getvalue()
+
+    @staticmethod
+    def to_indexed(image):
+        # Returns None when image has more colors than the palette can hold
+        colors = image.getcolors(256)
+        if colors:
+            palette = np.array([color for count, color in colors], dtype=np.uint8)
+            keys = palette.view(np.uint32).ravel()
+            order = np.argsort(keys)
+            pixels = np.asarray(image).view(np.uint32)[..., 0]
+            indexed = Image.fromarray(order[np.searchsorted(keys[order], pixels)].astype(np.uint8))
+            indexed.putpalette(palette.tobytes(), "RGBA")
+            return indexed
+        return None
+
+    @staticmethod
+    def quantize(image):
+        # Anti-aliased edges, icons and blurred images are reduced to their most used colors
+        return image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+
 class DreameMowerMapDataJsonRenderer:
     HALF_INT16 = 32768
     HALF_INT16_UPPER_HALF = 32767
     MAX = round(((HALF_INT16 + HALF_INT16_UPPER_HALF) / 10))
 
-    def __init__(self) -> None:
+    def __init__(self, palette: bool = True) -> None:
+        self._encoder: DreameMowerMapImageEncoder = DreameMowerMapImageEncoder(palette)
         self._map_data: MapData = None
         self._map_data_json: dict[str, Any] = None
         self._left: int = 0
@@ -3712,13 +3815,10 @@ class DreameMowerMapDataJsonRenderer:
     def _convert_angle(angle: int) -> int:
         return (((180 - angle) if (angle < 180) else (360 - angle + 180)) + 270) % 360
 
-    @staticmethod
-    def _to_buffer(image, extra_data: str) -> bytes:
-        buffer = io.BytesIO()
+    def _to_buffer(self, image, extra_data: str) -> bytes:
         info = PngImagePlugin.PngInfo()
         info.add_text(MAP_DATA_JSON_CLASS, extra_data, zip=True)
-        image.save(buffer, format="PNG", pnginfo=info)
-        return buffer.getvalue()
+        return self._encoder.encode(image, info)
 
     def render_map(self, map_data: MapData, robot_status: int = 0, station_status: int = 0) -> bytes:
         if map_data is None or map_data.empty_map:
@@ -4200,6 +4300,76 @@ class DreameMowerMapDataJsonRenderer:
         return self.default_map_image
 
 
+class DreameMowerMapSprite:
+    """Records the drawing operations of a single map object and replays them into an image that only covers
+    the bounding box of the object instead of the whole layer."""
+
+    def __init__(self, layer_size) -> None:
+        self._layer_size = layer_size
+        self._operations: list[tuple] = []
+        self._bounds: list[float] = None
+        self._draw = None
+
+    def _extend(self, x0, y0, x1, y1) -> None:
+        if self._bounds is None:
+            self._bounds = [x0, y0, x1, y1]
+        else:
+            self._bounds[0] = min(self._bounds[0], x0)
+            self._bounds[1] = min(self._bounds[1], y0)
+            self._bounds[2] = max(self._bounds[2], x1)
+            self._bounds[3] = max(self._bounds[3], y1)
+
+    def _shape(self, method, xy, **kwargs) -> None:
+        # Shapes may cover one more pixel than their coordinates after rasterization
+        self._extend(
+            min(xy[0], xy[2]) - 1,
+            min(xy[1], xy[3]) - 1,
+            max(xy[0], xy[2]) + 2,
+            max(xy[1], xy[3]) + 2,
+        )
+        self._operations.append((method, xy, kwargs))
+
+    def paste(self, image, box, mask=None) -> None:
+        self._extend(box[0], box[1], box[0] + image.size[0], box[1] + image.size[1])
+        self._operations.append(("paste", image, box, mask))
+
+    def ellipse(self, xy, fill=None) -> None:
+        self._shape("ellipse", xy, fill=fill)
+
+    def rounded_rectangle(self, xy, fill=None, radius=0) -> None:
+        self._shape("rounded_rectangle", xy, fill=fill, radius=radius)
+
+    def textbbox(self, xy, text, font):
+        if self._draw is None:
+            self._draw = ImageDraw.Draw(Image.new("RGBA", (1, 1), (255, 255, 255, 0)), "RGBA")
+        return self._draw.textbbox(xy, text, font)
+
+    def render(self) -> MapRendererSprite | None:
+        if self._bounds is None:
+            return None
+
+        # Offset is clamped to the layer so coordinates that were negative are not shifted
+        x0 = max(0, int(math.floor(self._bounds[0])))
+        y0 = max(0, int(math.floor(self._bounds[1])))
+        x1 = min(self._layer_size[0], int(math.ceil(self._bounds[2])))
+        y1 = min(self._layer_size[1], int(math.ceil(self._bounds[3])))
+        if x1 <= x0 or y1 <= y0:
+            return None
+
+        image = Image.new("RGBA", (x1 - x0, y1 - y0), (255, 255, 255, 0))
+        draw = None
+        for operation in self._operations:
+            if operation[0] == "paste":
+                image.paste(operation[1], (operation[2][0] - x0, operation[2][1] - y0), operation[3])
+            else:
+                if draw is None:
+                    draw = ImageDraw.Draw(image, "RGBA")
+                getattr(draw, operation[0])(
+                    [v - (y0 if i % 2 else x0) for i, v in enumerate(operation[1])], **operation[2]
+                )
+        return MapRendererSprite(image, x0, y0)
+
+
 class DreameMowerMapRenderer:
     def __init__(
         self,
@@ -4210,6 +4380,7 @@ class DreameMowerMapRenderer:
         low_resolution: bool = False,
         square: bool = False,
         cache: bool = True,
+        palette: bool = True,
     ) -> None:
         self.color_scheme: MapRendererColorScheme = MAP_COLOR_SCHEME_LIST.get(color_scheme, MapRendererColorScheme())
         self.icon_set: int = MAP_ICON_SET_LIST.get(icon_set, 0)
@@ -4229,7 +4400,14 @@ class DreameMowerMapRenderer:
         self._low_memory: bool = low_resolution
         self._square: bool = square
         self._cache: bool = cache
+        self._encoder: DreameMowerMapImageEncoder = DreameMowerMapImageEncoder(palette)
         self._has_mask: bool = False
+        self._pixel_type = None
+        self._pixel_colors = None
+        self._pixel_bounds: tuple[int, int, int, int] = None
+        self._pixel_crop: tuple[int, int, int, int] = None
+        self._pixel_offset: tuple[int, int] = None
+        self._path_end: tuple[int, Path] = None
         self._calibration_points: dict[str, int] = None
         self._default_calibration_points: dict[str, int] = [
             {
@@ -4279,8 +4457,6 @@ class DreameMowerMapRenderer:
         self._cruise_point_background = None
         self._furniture_background = None
         self._wifi_icon = None
-        self._font_file = None
-        self._light_font_file = None
         self._default_map_image = None
         self._obstacle_bottom_left_icon = None
         self._obstacle_top_left_icon = None
@@ -4311,19 +4487,41 @@ class DreameMowerMapRenderer:
 
         if self.config.cleaning_times:
             self._cleaning_times_icon = [
-                Image.open(BytesIO(base64.b64decode(icon))).convert("RGBA") for icon in repeats
+                DreameMowerMapRenderer._icon(icon) for icon in repeats
             ]
         if self.config.cleaning_mode:
             self._cleaning_mode_icon = [
-                Image.open(BytesIO(base64.b64decode(icon))).convert("RGBA") for icon in cleaning_mode
+                DreameMowerMapRenderer._icon(icon) for icon in cleaning_mode
             ]
 
-    @staticmethod
-    def _to_buffer(image) -> bytes:
+    def _to_buffer(self, image, exact: bool = True) -> bytes:
         if image:
-            buffer = io.BytesIO()
-            image.save(buffer, format="PNG")
-            return buffer.getvalue()
+            return self._encoder.encode(image, exact=exact)
+
+    def _exact_palette(self, map_data: MapData) -> bool:
+        """Live map layers and icons are drawn anti-aliased and never fit into a palette, skip probing their colors"""
+        return bool(
+            map_data
+            and map_data.saved_map
+            and not (self.config.icon or self.config.charger or self.config.furniture)
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=2)
+    def _font_file(light: bool = False) -> bytes:
+        return zlib.decompress(base64.b64decode(MAP_FONT_LIGHT if light else MAP_FONT), zlib.MAX_WBITS | 32)
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _get_font(size: int, light: bool = False) -> ImageFont.FreeTypeFont:
+        """Parsed fonts are shared by all renderers, label sizes rarely change between renders"""
+        return ImageFont.truetype(BytesIO(DreameMowerMapRenderer._font_file(light)), size)
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _icon(data: str):
+        # Decoded icons are shared by all renderers, they are copied before modified in place
+        return Image.open(BytesIO(base64.b64decode(data))).convert("RGBA")
 
     @staticmethod
     def _set_icon_color(image, size, color):
@@ -4359,6 +4557,15 @@ class DreameMowerMapRenderer:
 
             return [min_x, min_y, max_x, max_y]
 
+    @staticmethod
+    def _calculate_pixel_bounds(pixel_image) -> tuple[int, int, int, int]:
+        height, width = pixel_image.shape
+        rows = np.flatnonzero(pixel_image.any(axis=1))
+        if not len(rows):
+            return (width - 1, height - 1, 0, 0)
+        columns = np.flatnonzero(pixel_image.any(axis=0))
+        return (int(columns[0]), int(rows[0]), int(columns[-1]), int(rows[-1]))
+
     @staticmethod
     def _calculate_padding(
         dimensions,
@@ -4506,12 +4713,69 @@ class DreameMowerMapRenderer:
             return (int(outRGB[0]), int(outRGB[1]), int(outRGB[2]), int(outA * 255))
         return source
 
-    def _combine_layers(self, cached_layers, layer_size, parent, sub):
-        cached_layers[parent] = Image.new("RGBA", layer_size, (255, 255, 255, 0))
-        if sub in cached_layers:
-            for k, v in sorted(cached_layers[sub].items()):
-                if v is not None:
-                    cached_layers[parent] = Image.alpha_composite(cached_layers[parent], v)
+    @staticmethod
+    def _composite_layer(image, layer, box=None):
+        if box is None:
+            if isinstance(layer, MapRendererSprite):
+                image.alpha_composite(layer.image, (layer.x, layer.y))
+                return image
+            return Image.alpha_composite(image, layer)
+
+        # Only composite the part of the layer that falls into the box, image covers the box
+        if isinstance(layer, MapRendererSprite):
+            x, y, layer = layer.x, layer.y, layer.image
+        else:
+            x, y = 0, 0
+        x0 = max(box[0], x)
+        y0 = max(box[1], y)
+        x1 = min(box[2], x + layer.size[0])
+        y1 = min(box[3], y + layer.size[1])
+        if x1 > x0 and y1 > y0:
+            image.alpha_composite(layer, (x0 - box[0], y0 - box[1]), (x0 - x, y0 - y, x1 - x, y1 - y))
+        return image
+
+    @staticmethod
+    def _align_box(box, scale, layer_size) -> list[int] | None:
+        # Align the box to the downscale factor so resized region matches the resized whole layer
+        box = [
+            max(0, int(box[0] // scale * scale)),
+            max(0, int(box[1] // scale * scale)),
+            min(layer_size[0], int(math.ceil(box[2] / scale) * scale)),
+            min(layer_size[1], int(math.ceil(box[3] / scale) * scale)),
+        ]
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return None
+        return box
+
+    @staticmethod
+    def _sprite_box(sprite, scale, layer_size) -> list[int] | None:
+        if not sprite:
+            return None
+        return DreameMowerMapRenderer._align_box(
+            [sprite.x, sprite.y, sprite.x + sprite.image.size[0], sprite.y + sprite.image.size[1]],
+            scale,
+            layer_size,
+        )
+
+    def _combine_layers(self, cached_layers, parent, sub):
+        sprites = [v for k, v in sorted(cached_layers[sub].items()) if v is not None] if sub in cached_layers else []
+        if not sprites:
+            cached_layers[parent] = None
+            return
+
+        x0 = min(sprite.x for sprite in sprites)
+        y0 = min(sprite.y for sprite in sprites)
+        image = Image.new(
+            "RGBA",
+            (
+                max(sprite.x + sprite.image.size[0] for sprite in sprites) - x0,
+                max(sprite.y + sprite.image.size[1] for sprite in sprites) - y0,
+            ),
+            (255, 255, 255, 0),
+        )
+        for sprite in sprites:
+            image.alpha_composite(sprite.image, (sprite.x - x0, sprite.y - y0))
+        cached_layers[parent] = MapRendererSprite(image, x0, y0)
 
     def get_data_string(
         self,
@@ -4837,6 +5101,19 @@ class DreameMowerMapRenderer:
         )
         return map_data_json
 
+    def resize_image(self, image_bytes, width: int | None = None, height: int | None = None) -> bytes:
+        """Downscale rendered image to fit into the requested size by keeping its aspect ratio"""
+        if image_bytes:
+            image = Image.open(io.BytesIO(image_bytes))
+            size = (width if width else image.size[0], height if height else image.size[1])
+            if size[0] >= image.size[0] and size[1] >= image.size[1]:
+                return image_bytes
+
+            image = image.convert("RGBA")
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            return self._to_buffer(image, False)
+        return image_bytes
+
     def render_obstacle_image(
         self,
         image_bytes,
@@ -4878,18 +5155,12 @@ class DreameMowerMapRenderer:
 
             if render_box:
                 if self._obstacle_bottom_left_icon is None:
-                    self._obstacle_bottom_left_icon = Image.open(
-                        BytesIO(base64.b64decode(MAP_ROBOT_OBSTACLE_BOTTOM_LEFT_IMAGE))
-                    ).convert("RGBA")
-                    self._obstacle_top_left_icon = Image.open(
-                        BytesIO(base64.b64decode(MAP_ROBOT_OBSTACLE_TOP_LEFT_IMAGE))
-                    ).convert("RGBA")
-                    self._obstacle_bottom_right_icon = Image.open(
-                        BytesIO(base64.b64decode(MAP_ROBOT_OBSTACLE_BOTTOM_RIGHT_IMAGE))
-                    ).convert("RGBA")
-                    self._obstacle_top_right_icon = Image.open(
-                        BytesIO(base64.b64decode(MAP_ROBOT_OBSTACLE_TOP_RIGHT_IMAGE))
-                    ).convert("RGBA")
+                    self._obstacle_bottom_left_icon = DreameMowerMapRenderer._icon(MAP_ROBOT_OBSTACLE_BOTTOM_LEFT_IMAGE)
+                    self._obstacle_top_left_icon = DreameMowerMapRenderer._icon(MAP_ROBOT_OBSTACLE_TOP_LEFT_IMAGE)
+                    self._obstacle_bottom_right_icon = DreameMowerMapRenderer._icon(
+                        MAP_ROBOT_OBSTACLE_BOTTOM_RIGHT_IMAGE
+                    )
+                    self._obstacle_top_right_icon = DreameMowerMapRenderer._icon(MAP_ROBOT_OBSTACLE_TOP_RIGHT_IMAGE)
 
                 icon_size = int(round(5 * h / 100.0))
                 obstacle_bottom_left_icon = self._obstacle_bottom_left_icon.resize((icon_size, icon_size))
@@ -5012,7 +5283,7 @@ class DreameMowerMapRenderer:
                 ):
                     self.render_complete = True
                     _LOGGER.info("Skip render frame, map data not changed")
-                    return self._to_buffer(self._image)
+                    return self._to_buffer(self._image, self._exact_palette(map_data))
 
             scale = (
                 2
@@ -5191,175 +5462,196 @@ class DreameMowerMapRenderer:
                         else:
                             area_colors[k] = area_colors[MapPixelType.FLOOR.value]
 
-                pixels = np.full(
-                    (
-                        map_data.dimensions.height,
-                        map_data.dimensions.width,
-                        4,
-                    ),
-                    area_colors[MapPixelType.OUTSIDE.value],
+                pixel_image = map_data.pixel_type.T[::-1]
+                pixel_colors = np.array(
+                    [area_colors.get(i, area_colors[MapPixelType.NEW_SEGMENT.value]) for i in range(256)],
                     dtype=np.uint8,
                 )
+                pixel_colors[MapPixelType.OUTSIDE.value] = area_colors[MapPixelType.OUTSIDE.value]
+                pixel_bounds = DreameMowerMapRenderer._calculate_pixel_bounds(pixel_image)
 
-                if self._has_mask:
-                    mask_color = (255, 255, 255, 255)
-                    mask = np.full(
-                        (
-                            map_data.dimensions.height,
-                            map_data.dimensions.width,
-                            4,
-                        ),
-                        (255, 255, 255, 0),
-                        dtype=np.uint8,
+                # Repaint only the tiles with changed pixels when colors and crop of the base layer are not changed
+                if (
+                    self._cache
+                    and self._map_data is not None
+                    and cached_layers.get(MapRendererLayer.IMAGE)
+                    and self._pixel_type is not None
+                    and self._pixel_crop is not None
+                    and not render_material
+                    and not self._has_mask
+                    and not (map_data.history_map and map_data.neglected_segments)
+                    and self._pixel_type.shape == pixel_image.shape
+                    and self._pixel_bounds == pixel_bounds
+                    and np.array_equal(self._pixel_colors, pixel_colors)
+                ):
+                    self.render_image_tiles(
+                        cached_layers[MapRendererLayer.IMAGE],
+                        self._pixel_type,
+                        pixel_image,
+                        pixel_colors,
+                        self._pixel_crop,
+                        self._pixel_offset,
+                        scale,
                     )
+                    map_data.dimensions.crop = self._map_data.dimensions.crop
+                else:
+                    self._pixel_crop = None
+                    pixels = pixel_colors[pixel_image]
 
-                if map_data.history_map and map_data.neglected_segments:
-                    segment_mask = np.full(
-                        (
-                            map_data.dimensions.height,
-                            map_data.dimensions.width,
-                            4,
-                        ),
-                        (255, 255, 255, 0),
-                        dtype=np.uint8,
-                    )
+                    if self._has_mask:
+                        mask_color = (255, 255, 255, 255)
+                        mask = np.full(
+                            (
+                                map_data.dimensions.height,
+                                map_data.dimensions.width,
+                                4,
+                            ),
+                            (255, 255, 255, 0),
+                            dtype=np.uint8,
+                        )
+                        mask[(pixel_image != 0) & (pixel_image != 255)] = mask_color
 
-                min_x = map_data.dimensions.width - 1
-                min_y = map_data.dimensions.height - 1
-                max_x = 0
-                max_y = 0
+                    if map_data.history_map and map_data.neglected_segments:
+                        segment_mask = np.full(
+                            (
+                                map_data.dimensions.height,
+                                map_data.dimensions.width,
+                                4,
+                            ),
+                            (255, 255, 255, 0),
+                            dtype=np.uint8,
+                        )
+                        neglected = np.array([i != 0 and i in map_data.neglected_segments for i in range(256)])
+                        segment_mask[neglected[pixel_image]] = self.color_scheme.neglected_segment
 
-                for y in range(map_data.dimensions.height):
-                    for x in range(map_data.dimensions.width):
-                        px_type = int(map_data.pixel_type[x, map_data.dimensions.height - y - 1])
+                    min_x, min_y, max_x, max_y = pixel_bounds
 
-                        if px_type != 0:
-                            pixels[y, x] = area_colors.get(px_type, area_colors[253])
+                    if render_material:
+                        floor_scale = 2
+                        pixels = pixels.repeat(floor_scale, axis=0).repeat(floor_scale, axis=1)
+                        if render_material:
+                            floor_material = self.render_floor_material(
+                                pixels,
+                                map_data.floor_material,
+                                map_data.pixel_type,
+                                self.color_scheme.material_color,
+                                map_data.dimensions,
+                                floor_scale,
+                            )
+                            if floor_material is not None:
+                                pixels = floor_material
+                                _LOGGER.debug("Render MATERIAL")
 
-                            max_x = max(x, max_x)
-                            min_x = min(x, min_x)
-                            max_y = max(y, max_y)
-                            min_y = min(y, min_y)
+                        if scale != floor_scale:
+                            pixels = pixels.repeat(scale / floor_scale, axis=0).repeat(scale / floor_scale, axis=1)
+                    else:
+                        pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
 
-                            if self._has_mask and px_type != 255:
-                                mask[y, x] = mask_color
+                    if self._has_mask:
+                        mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
 
-                            if segment_mask is not None:
-                                if px_type in map_data.neglected_segments:
-                                    segment_mask[y, x] = self.color_scheme.neglected_segment
+                    if segment_mask is not None:
+                        segment_mask = segment_mask.repeat(scale, axis=0).repeat(scale, axis=1)
+
+                    pixel_crop = (0, 0, map_data.dimensions.width, map_data.dimensions.height)
+                    if map_data.dimensions.bounds:
+                        # min_x = max(0, min(map_data.dimensions.bounds[0], min_x))
+                        # max_x = min((map_data.dimensions.width - 1), max(map_data.dimensions.bounds[2], max_x))
+                        # min_y = max(0, min(map_data.dimensions.bounds[1], min_y))
+                        # max_y = min((map_data.dimensions.height - 1), max(map_data.dimensions.bounds[3], max_y))
+                        min_x = max(min(map_data.dimensions.bounds[0], min_x), min_x)
+                        max_x = min(max(map_data.dimensions.bounds[2], max_x), max_x)
+                        min_y = max(min(map_data.dimensions.bounds[1], min_y), min_y)
+                        max_y = min(max(map_data.dimensions.bounds[3], max_y), max_y)
 
-                if render_material:
-                    floor_scale = 2
-                    pixels = pixels.repeat(floor_scale, axis=0).repeat(floor_scale, axis=1)
-                    if render_material:
-                        floor_material = self.render_floor_material(
-                            pixels,
-                            map_data.floor_material,
-                            map_data.pixel_type,
-                            self.color_scheme.material_color,
-                            map_data.dimensions,
-                            floor_scale,
-                        )
-                        if floor_material is not None:
-                            pixels = floor_material
-                            _LOGGER.debug("Render MATERIAL")
+                    if (
+                        min_x != (map_data.dimensions.width - 1)
+                        and min_y != (map_data.dimensions.height - 1)
+                        and max_x != 0
+                        and max_y != 0
+                    ) and (
+                        min_x != 0
+                        or min_y != 0
+                        or max_x != (map_data.dimensions.width - 1)
+                        or max_y != (map_data.dimensions.height - 1)
+                    ):
+                        from_y = min_y * scale
+                        to_y = (max_y + 1) * scale
+                        from_x = min_x * scale
+                        to_x = (max_x + 1) * scale
+                        pixels = pixels[from_y:to_y, from_x:to_x]
+                        if self._has_mask:
+                            mask = mask[from_y:to_y, from_x:to_x]
+                        if segment_mask is not None:
+                            segment_mask = segment_mask[from_y:to_y, from_x:to_x]
+                        map_data.dimensions.crop = [
+                            from_x,
+                            from_y,
+                            (map_data.dimensions.width - (max_x + 1)) * scale,
+                            (map_data.dimensions.height - (max_y + 1)) * scale,
+                        ]
+                        pixel_crop = (min_x, min_y, max_x + 1, max_y + 1)
 
-                    if scale != floor_scale:
-                        pixels = pixels.repeat(scale / floor_scale, axis=0).repeat(scale / floor_scale, axis=1)
-                else:
-                    pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+                    if self._map_data and self._map_data.dimensions.crop != map_data.dimensions.crop:
+                        self._map_data = None
 
-                if self._has_mask:
-                    mask = mask.repeat(scale, axis=0).repeat(scale, axis=1)
+                    image = Image.fromarray(pixels)
+                    if self._square and not map_data.wifi_map:  # and not map_data.saved_map:
+                        height = image.size[0] + map_data.dimensions.padding[0] + map_data.dimensions.padding[2]
+                        width = image.size[1] + map_data.dimensions.padding[1] + map_data.dimensions.padding[3]
+                        if height != width:
+                            dif = int(abs(height - width) / 2)
+                            if height < width:
+                                map_data.dimensions.padding[0] = map_data.dimensions.padding[0] + dif
+                                map_data.dimensions.padding[2] = map_data.dimensions.padding[2] + dif
+                            else:
+                                map_data.dimensions.padding[1] = map_data.dimensions.padding[1] + dif
+                                map_data.dimensions.padding[3] = map_data.dimensions.padding[3] + dif
 
-                if segment_mask is not None:
-                    segment_mask = segment_mask.repeat(scale, axis=0).repeat(scale, axis=1)
+                    cached_layers[MapRendererLayer.IMAGE] = ImageOps.expand(
+                        Image.fromarray(pixels),
+                        border=tuple(map_data.dimensions.padding),
+                        fill=bg_color,
+                    )
 
-                if map_data.dimensions.bounds:
-                    # min_x = max(0, min(map_data.dimensions.bounds[0], min_x))
-                    # max_x = min((map_data.dimensions.width - 1), max(map_data.dimensions.bounds[2], max_x))
-                    # min_y = max(0, min(map_data.dimensions.bounds[1], min_y))
-                    # max_y = min((map_data.dimensions.height - 1), max(map_data.dimensions.bounds[3], max_y))
-                    min_x = max(min(map_data.dimensions.bounds[0], min_x), min_x)
-                    max_x = min(max(map_data.dimensions.bounds[2], max_x), max_x)
-                    min_y = max(min(map_data.dimensions.bounds[1], min_y), min_y)
-                    max_y = min(max(map_data.dimensions.bounds[3], max_y), max_y)
+                    if self._cache and not render_material:
+                        self._pixel_crop = pixel_crop
+                        self._pixel_offset = (
+                            map_data.dimensions.padding[0] - pixel_crop[0] * scale,
+                            map_data.dimensions.padding[1] - pixel_crop[1] * scale,
+                        )
 
-                if (
-                    min_x != (map_data.dimensions.width - 1)
-                    and min_y != (map_data.dimensions.height - 1)
-                    and max_x != 0
-                    and max_y != 0
-                ) and (
-                    min_x != 0
-                    or min_y != 0
-                    or max_x != (map_data.dimensions.width - 1)
-                    or max_y != (map_data.dimensions.height - 1)
-                ):
-                    from_y = min_y * scale
-                    to_y = (max_y + 1) * scale
-                    from_x = min_x * scale
-                    to_x = (max_x + 1) * scale
-                    pixels = pixels[from_y:to_y, from_x:to_x]
                     if self._has_mask:
-                        mask = mask[from_y:to_y, from_x:to_x]
-                    if segment_mask is not None:
-                        segment_mask = segment_mask[from_y:to_y, from_x:to_x]
-                    map_data.dimensions.crop = [
-                        from_x,
-                        from_y,
-                        (map_data.dimensions.width - (max_x + 1)) * scale,
-                        (map_data.dimensions.height - (max_y + 1)) * scale,
-                    ]
-
-                if self._map_data and self._map_data.dimensions.crop != map_data.dimensions.crop:
-                    self._map_data = None
-
-                image = Image.fromarray(pixels)
-                if self._square and not map_data.wifi_map:  # and not map_data.saved_map:
-                    height = image.size[0] + map_data.dimensions.padding[0] + map_data.dimensions.padding[2]
-                    width = image.size[1] + map_data.dimensions.padding[1] + map_data.dimensions.padding[3]
-                    if height != width:
-                        dif = int(abs(height - width) / 2)
-                        if height < width:
-                            map_data.dimensions.padding[0] = map_data.dimensions.padding[0] + dif
-                            map_data.dimensions.padding[2] = map_data.dimensions.padding[2] + dif
-                        else:
-                            map_data.dimensions.padding[1] = map_data.dimensions.padding[1] + dif
-                            map_data.dimensions.padding[3] = map_data.dimensions.padding[3] + dif
-
-                cached_layers[MapRendererLayer.IMAGE] = ImageOps.expand(
-                    Image.fromarray(pixels),
-                    border=tuple(map_data.dimensions.padding),
-                    fill=bg_color,
-                )
+                        if self._cache and self._map_data:
+                            self._map_data.path = None
+
+                        cached_layers[MapRendererLayer.PATH_MASK] = ImageOps.expand(
+                            Image.fromarray(mask.repeat(object_scale, axis=0).repeat(object_scale, axis=1)),
+                            border=(
+                                map_data.dimensions.padding[0] * object_scale,
+                                map_data.dimensions.padding[1] * object_scale,
+                                map_data.dimensions.padding[2] * object_scale,
+                                map_data.dimensions.padding[3] * object_scale,
+                            ),
+                            fill=(255, 255, 255, 0),
+                        )
 
-                if self._has_mask:
-                    if self._cache and self._map_data:
-                        self._map_data.path = None
-
-                    cached_layers[MapRendererLayer.PATH_MASK] = ImageOps.expand(
-                        Image.fromarray(mask.repeat(object_scale, axis=0).repeat(object_scale, axis=1)),
-                        border=(
-                            map_data.dimensions.padding[0] * object_scale,
-                            map_data.dimensions.padding[1] * object_scale,
-                            map_data.dimensions.padding[2] * object_scale,
-                            map_data.dimensions.padding[3] * object_scale,
-                        ),
-                        fill=(255, 255, 255, 0),
-                    )
+                    if segment_mask is not None:
+                        segment_mask = ImageOps.expand(
+                            Image.fromarray(segment_mask),
+                            border=(
+                                map_data.dimensions.padding[0],
+                                map_data.dimensions.padding[1],
+                                map_data.dimensions.padding[2],
+                                map_data.dimensions.padding[3],
+                            ),
+                            fill=(255, 255, 255, 0),
+                        )
 
-                if segment_mask is not None:
-                    segment_mask = ImageOps.expand(
-                        Image.fromarray(segment_mask),
-                        border=(
-                            map_data.dimensions.padding[0],
-                            map_data.dimensions.padding[1],
-                            map_data.dimensions.padding[2],
-                            map_data.dimensions.padding[3],
-                        ),
-                        fill=(255, 255, 255, 0),
-                    )
+                if self._cache:
+                    self._pixel_type = pixel_image.copy()
+                    self._pixel_colors = pixel_colors
+                    self._pixel_bounds = pixel_bounds
             else:
                 map_data.dimensions.crop = self._map_data.dimensions.crop
 
@@ -5374,23 +5666,75 @@ class DreameMowerMapRenderer:
                     or self._map_data.path != map_data.path
                     or not cached_layers.get(MapRendererLayer.PATH)
                 ):
-                    cached_layers[MapRendererLayer.PATH] = self.render_path(
+                    path_size = (
+                        int(image.size[0] * object_scale),
+                        int(image.size[1] * object_scale),
+                    )
+                    path_layer = cached_layers.get(MapRendererLayer.SCALED_PATH)
+                    start = 0
+                    # Path is only extended with the points received with P frames while mowing,
+                    # draw the new points on the cached path layer instead of drawing the whole path again
+                    if (
+                        self._cache
+                        and path_layer is not None
+                        and path_layer.size == path_size
+                        and self._map_data is not None
+                        and self._path_end is not None
+                        and cached_layers.get(MapRendererLayer.PATH)
+                        and self._map_data.dimensions == map_data.dimensions
+                        and self._map_data.dimensions.scale == map_data.dimensions.scale
+                        and self._map_data.dimensions.crop == map_data.dimensions.crop
+                        and self._map_data.dimensions.padding == map_data.dimensions.padding
+                        and self._path_end[0] < len(map_data.path)
+                        # Last drawn point is still at the same index, point equality does not include the path type
+                        and map_data.path[self._path_end[0] - 1] == self._path_end[1]
+                        and map_data.path[self._path_end[0] - 1].path_type == self._path_end[1].path_type
+                    ):
+                        start = self._path_end[0]
+                    else:
+                        path_layer = None
+
+                    path_layer, box = self.render_path(
                         map_data.path,
                         self.color_scheme.path,
-                        (
-                            int(image.size[0] * object_scale),
-                            int(image.size[1] * object_scale),
-                        ),
-                        cached_layers.get(MapRendererLayer.PATH_MASK),
+                        path_size,
                         map_data.dimensions,
                         0.375 * scale * object_scale,
                         object_scale,
+                        path_layer,
+                        start,
                     )
-                    cached_layers[MapRendererLayer.PATH].thumbnail(image.size, Image.Resampling.BOX, reducing_gap=1.5)
+                    self._path_end = (len(map_data.path), map_data.path[-1])
+
+                    if start:
+                        box = DreameMowerMapRenderer._align_box(box, object_scale, path_size) if box else None
+                        if box:
+                            cached_layers[MapRendererLayer.PATH].paste(
+                                path_layer.crop(box).resize(
+                                    (
+                                        int((box[2] - box[0]) / object_scale),
+                                        int((box[3] - box[1]) / object_scale),
+                                    ),
+                                    Image.Resampling.BOX,
+                                    reducing_gap=1.5,
+                                ),
+                                (int(box[0] / object_scale), int(box[1] / object_scale)),
+                            )
+                    else:
+                        cached_layers[MapRendererLayer.PATH] = path_layer.resize(
+                            image.size, Image.Resampling.BOX, reducing_gap=1.5
+                        )
+
+                    if self._cache and not self._low_memory:
+                        cached_layers[MapRendererLayer.SCALED_PATH] = path_layer
+                    elif MapRendererLayer.SCALED_PATH in cached_layers:
+                        del cached_layers[MapRendererLayer.SCALED_PATH]
                     _LOGGER.debug("Render PATH")
                 image = Image.alpha_composite(image, cached_layers[MapRendererLayer.PATH])
             elif self._cache and cached_layers.get(MapRendererLayer.PATH):
                 del cached_layers[MapRendererLayer.PATH]
+                if MapRendererLayer.SCALED_PATH in cached_layers:
+                    del cached_layers[MapRendererLayer.SCALED_PATH]
 
             image = self.render_objects(cached_layers, map_data, robot_status, station_status, image, object_scale)
 
@@ -5446,13 +5790,10 @@ class DreameMowerMapRenderer:
 
                 text_draw = ImageDraw.Draw(image, "RGBA")
                 text_size = int(image_width * 0.035)
-                if self._light_font_file is None:
-                    self._light_font_file = zlib.decompress(base64.b64decode(MAP_FONT_LIGHT), zlib.MAX_WBITS | 32)
-
-                text_font = ImageFont.truetype(BytesIO(self._light_font_file), text_size)
+                text_font = self._get_font(text_size, True)
                 if map_data.history_map:
-                    value_font = ImageFont.truetype(BytesIO(self._light_font_file), int(text_size * 1.8))
-                    name_font = ImageFont.truetype(BytesIO(self._light_font_file), int(text_size * 0.8))
+                    value_font = self._get_font(int(text_size * 1.8), True)
+                    name_font = self._get_font(int(text_size * 0.8), True)
                 left, top, width, height = text_draw.textbbox((0, 0), header_text, font=text_font)
                 max_width = image_width * 0.9
                 if width > max_width:
@@ -5628,7 +5969,7 @@ class DreameMowerMapRenderer:
             _LOGGER.error("Map render Failed: %s", traceback.format_exc())
 
         self.render_complete = True
-        return self._to_buffer(self._image if self._cache else image)
+        return self._to_buffer(self._image if self._cache else image, self._exact_palette(map_data))
 
     def render_objects(self, cached_layers, map_data, robot_status, station_status, map_image, scale):
         layer_size = (int(map_image.size[0] * scale), int(map_image.size[1] * scale))
@@ -5636,6 +5977,7 @@ class DreameMowerMapRenderer:
         border_width = 2 if map_data.dimensions.scale > 2 else 1
         changes = []
         layers = []
+        robot_layer = cached_layers.get(MapRendererLayer.ROBOT)
 
         if map_data.rotation == 0 or map_data.rotation == 180 or self._square:
             width = (map_data.dimensions.width) + (
@@ -5824,7 +6166,7 @@ class DreameMowerMapRenderer:
 
                 if changed:
                     changes.append(layer)
-                    self._combine_layers(cached_layers, layer_size, layer, MapRendererLayer.FURNITURE)
+                    self._combine_layers(cached_layers, layer, MapRendererLayer.FURNITURE)
         elif self._cache and cached_layers.get(layer):
             changes.append(layer)
             del cached_layers[layer]
@@ -5925,7 +6267,7 @@ class DreameMowerMapRenderer:
 
                 if changed:
                     changes.append(layer)
-                    self._combine_layers(cached_layers, layer_size, layer, MapRendererLayer.SEGMENT)
+                    self._combine_layers(cached_layers, layer, MapRendererLayer.SEGMENT)
         elif self._cache and cached_layers.get(layer):
             changes.append(layer)
             del cached_layers[layer]
@@ -6239,7 +6581,7 @@ class DreameMowerMapRenderer:
 
                 if changed:
                     changes.append(layer)
-                    self._combine_layers(cached_layers, layer_size, layer, MapRendererLayer.OBSTACLE)
+                    self._combine_layers(cached_layers, layer, MapRendererLayer.OBSTACLE)
         elif self._cache and cached_layers.get(layer):
             changes.append(layer)
             del cached_layers[layer]
@@ -6284,29 +6626,72 @@ class DreameMowerMapRenderer:
 
                 if changed:
                     changes.append(layer)
-                    self._combine_layers(cached_layers, layer_size, layer, MapRendererLayer.CRUISE_POINT)
+                    self._combine_layers(cached_layers, layer, MapRendererLayer.CRUISE_POINT)
         elif self._cache and cached_layers.get(layer):
             changes.append(layer)
             del cached_layers[layer]
 
-        if changes or not self._cache:
-            cached_layers[MapRendererLayer.OBJECTS] = Image.new(
+        if (
+            self._cache
+            and changes
+            and all(l == MapRendererLayer.ROBOT for l in changes)
+            and cached_layers.get(MapRendererLayer.OBJECTS)
+            and cached_layers.get(MapRendererLayer.STATIC_OBJECTS)
+            and cached_layers[MapRendererLayer.STATIC_OBJECTS].size == layer_size
+            and (layer_size == map_image.size or scale == int(scale))
+        ):
+            # Only the robot is changed, recomposite the area it has left and entered on top of the static layers
+            scale = int(scale) if layer_size != map_image.size else 1
+            for box in (
+                DreameMowerMapRenderer._sprite_box(robot_layer, scale, layer_size),
+                DreameMowerMapRenderer._sprite_box(cached_layers.get(MapRendererLayer.ROBOT), scale, layer_size),
+            ):
+                if box is None:
+                    continue
+
+                _LOGGER.debug("Render %s", MapRendererLayer.ROBOT.name)
+                region = cached_layers[MapRendererLayer.STATIC_OBJECTS].crop(box)
+                for l in layers:
+                    if l >= MapRendererLayer.ROBOT and cached_layers.get(l):
+                        region = self._composite_layer(region, cached_layers[l], box)
+
+                if scale != 1:
+                    region = region.resize(
+                        (int(region.size[0] / scale), int(region.size[1] / scale)),
+                        Image.Resampling.BOX,
+                        reducing_gap=1.5,
+                    )
+                cached_layers[MapRendererLayer.OBJECTS].paste(region, (int(box[0] / scale), int(box[1] / scale)))
+        elif changes or not self._cache:
+            # Layers below the robot are cached separately so robot movement does not require rendering them again
+            objects = Image.new(
                 "RGBA",
                 [layer_size[0], layer_size[1]],
                 (255, 255, 255, 0),
             )
             for l in layers:
+                if l >= MapRendererLayer.ROBOT:
+                    continue
                 if cached_layers.get(l):
                     if l in changes:
                         _LOGGER.debug("Render %s", l.name)
-                    cached_layers[MapRendererLayer.OBJECTS] = Image.alpha_composite(
-                        cached_layers[MapRendererLayer.OBJECTS], cached_layers[l]
-                    )
+                    objects = self._composite_layer(objects, cached_layers[l])
+
+            if self._cache:
+                cached_layers[MapRendererLayer.STATIC_OBJECTS] = objects
+                objects = objects.copy()
+
+            for l in layers:
+                if l < MapRendererLayer.ROBOT:
+                    continue
+                if cached_layers.get(l):
+                    if l in changes:
+                        _LOGGER.debug("Render %s", l.name)
+                    objects = self._composite_layer(objects, cached_layers[l])
 
             if layer_size != map_image.size:
-                cached_layers[MapRendererLayer.OBJECTS].thumbnail(
-                    map_image.size, Image.Resampling.BOX, reducing_gap=1.5
-                )
+                objects.thumbnail(map_image.size, Image.Resampling.BOX, reducing_gap=1.5)
+            cached_layers[MapRendererLayer.OBJECTS] = objects
         else:
             if not cached_layers.get(MapRendererLayer.OBJECTS):
                 return map_image
@@ -6376,57 +6761,47 @@ class DreameMowerMapRenderer:
             )
         return new_layer
 
-    def render_path(self, path, color, layer_size, mask, dimensions, width, scale):
-        new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
+    def render_path(self, path, color, layer_size, dimensions, width, scale, layer=None, start=0):
+        """Draws the path on a new layer or only the points after start on the given layer that already contains
+        the previous points. Returns the layer and the bounding box of the drawn area."""
+        new_layer = layer if layer is not None else Image.new("RGBA", layer_size, (255, 255, 255, 0))
         draw = ImageDraw.Draw(new_layer, "RGBA")
         sweep = []
-        mop = []
         sweep_path = []
-        path_type = ""
-
-        for point in path:
-            p = point.to_img(dimensions)
-            if point.path_type == PathType.LINE:
-                l = [p.x * scale, p.y * scale]
+        points = []
+
+        # Segments are drawn without joints and every point gets a round cap, drawing the points after start on
+        # the layer of the previous points is identical to drawing the whole path again
+        for i in range(max(start - 1, 0), len(path)):
+            p = path[i].to_img(dimensions)
+            x, y = p.x * scale, p.y * scale
+            if i >= start:
+                points.append((x, y))
+            if path[i].path_type == PathType.LINE:
+                sweep_path.extend((x, y))
             else:
-                if sweep_path:
+                if len(sweep_path) > 2:
                     sweep.append(sweep_path)
+                sweep_path = [x, y]
 
-                path_type = point.path_type
-                sweep_path = []
-
-        if sweep_path:
+        if len(sweep_path) > 2:
             sweep.append(sweep_path)
 
-        for path in sweep:
-            size = width * scale
-            draw.line(
-                path,
-                width=int(round(size)),
-                fill=color,
-                joint="curve",
-            )
-            size = int(math.floor(size / 2))
-            draw.ellipse(
-                [
-                    path[-2] - size,
-                    path[-1] - size,
-                    path[-2] + size,
-                    path[-1] + size,
-                ],
-                fill=color,
-            )
-            draw.ellipse(
-                [
-                    path[0] - size,
-                    path[1] - size,
-                    path[0] + size,
-                    path[1] + size,
-                ],
-                fill=color,
-            )
+        line_width = width * scale
+        for line in sweep:
+            draw.line(line, width=int(round(line_width)), fill=color)
 
-        return new_layer
+        size = int(math.floor(line_width / 2))
+        for x, y in points:
+            draw.ellipse([x - size, y - size, x + size, y + size], fill=color)
+
+        if not points:
+            return new_layer, None
+
+        margin = line_width + 2
+        xs = [x for line in sweep for x in line[0::2]] + [x for x, y in points]
+        ys = [y for line in sweep for y in line[1::2]] + [y for x, y in points]
+        return new_layer, [min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin]
 
     def render_charger(
         self,
@@ -6438,7 +6813,7 @@ class DreameMowerMapRenderer:
         map_rotation,
         scale,
     ):
-        new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
+        sprite = DreameMowerMapSprite(layer_size)
         icon_size = int(size * scale)
         if self.icon_set == 3:
             icon_size = int(icon_size * 1.2)
@@ -6457,7 +6832,7 @@ class DreameMowerMapRenderer:
                     charger_image = MAP_CHARGER_VSLAM_IMAGE_DREAME
                 else:
                     charger_image = MAP_CHARGER_IMAGE_DREAME
-            self._charger_icon = Image.open(BytesIO(base64.b64decode(charger_image))).convert("RGBA")
+            self._charger_icon = DreameMowerMapRenderer._icon(charger_image)
 
             if self.icon_set == 3:
                 self._charger_icon = DreameMowerMapRenderer._set_icon_color(
@@ -6483,7 +6858,7 @@ class DreameMowerMapRenderer:
         )
 
         point = charger_position.to_img(dimensions)
-        new_layer.paste(
+        sprite.paste(
             charger_icon,
             (
                 int((point.x * scale) - (charger_icon.size[0] / 2)),
@@ -6492,7 +6867,7 @@ class DreameMowerMapRenderer:
             charger_icon,
         )
 
-        return new_layer
+        return sprite.render()
 
     def render_mower(
         self,
@@ -6504,7 +6879,7 @@ class DreameMowerMapRenderer:
         map_rotation,
         scale,
     ):
-        new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
+        sprite = DreameMowerMapSprite(layer_size)
         icon_size = int(size * scale)
         robot_icon_size = (
             int(icon_size * 1.4)
@@ -6529,7 +6904,7 @@ class DreameMowerMapRenderer:
                     else:
                         robot_image = MAP_ROBOT_LIDAR_IMAGE_DREAME_DARK
 
-            self._robot_icon = Image.open(BytesIO(base64.b64decode(robot_image))).convert("RGBA")
+            self._robot_icon = DreameMowerMapRenderer._icon(robot_image)
 
             if (
                 self.icon_set != 2
@@ -6557,8 +6932,7 @@ class DreameMowerMapRenderer:
             if robot_status == 1:
                 if self._robot_cleaning_icon is None:
                     self._robot_cleaning_icon = (
-                        Image.open(BytesIO(base64.b64decode(MAP_ROBOT_CLEANING_IMAGE)))
-                        .convert("RGBA")
+                        DreameMowerMapRenderer._icon(MAP_ROBOT_CLEANING_IMAGE)
                         .resize(
                             ((int(icon_size * 1.25), int(icon_size * 1.25))),
                             resample=Image.Resampling.NEAREST,
@@ -6569,8 +6943,7 @@ class DreameMowerMapRenderer:
                 if self.config.cleaning_direction:
                     if self._robot_cleaning_direction_icon is None:
                         self._robot_cleaning_direction_icon = (
-                            Image.open(BytesIO(base64.b64decode(MAP_ROBOT_CLEANING_DIRECTION_IMAGE)))
-                            .convert("RGBA")
+                            DreameMowerMapRenderer._icon(MAP_ROBOT_CLEANING_DIRECTION_IMAGE)
                             .resize(
                                 ((int(icon_size * 1.5), int(icon_size * 1.5))),
                             )
@@ -6581,7 +6954,7 @@ class DreameMowerMapRenderer:
                     offset = int(icon_size * 0.3)
                     x = point.x + offset * math.cos(-robot_position.a * math.pi / 180)
                     y = point.y + offset * math.sin(-robot_position.a * math.pi / 180)
-                    new_layer.paste(
+                    sprite.paste(
                         ico,
                         (
                             int(x * scale - (ico.size[0] / 2)),
@@ -6591,8 +6964,7 @@ class DreameMowerMapRenderer:
             elif robot_status == 2:
                 if self._robot_charging_icon is None:
                     self._robot_charging_icon = (
-                        Image.open(BytesIO(base64.b64decode(MAP_ROBOT_CHARGING_IMAGE)))
-                        .convert("RGBA")
+                        DreameMowerMapRenderer._icon(MAP_ROBOT_CHARGING_IMAGE)
                         .resize(
                             ((int(icon_size * 1.3), int(icon_size * 1.3))),
                             resample=Image.Resampling.NEAREST,
@@ -6602,8 +6974,7 @@ class DreameMowerMapRenderer:
             elif has_warning:
                 if self._robot_warning_icon is None:
                     self._robot_warning_icon = (
-                        Image.open(BytesIO(base64.b64decode(MAP_ROBOT_WARNING_IMAGE)))
-                        .convert("RGBA")
+                        DreameMowerMapRenderer._icon(MAP_ROBOT_WARNING_IMAGE)
                         .resize(
                             ((int(icon_size * 1.3), int(icon_size * 1.3))),
                             resample=Image.Resampling.NEAREST,
@@ -6615,7 +6986,7 @@ class DreameMowerMapRenderer:
                 mask = Image.new("L", status_icon.size, 0)
                 draw = ImageDraw.Draw(mask)
                 draw.ellipse((0, 0, status_icon.size[0], status_icon.size[1]), fill=255)
-                new_layer.paste(
+                sprite.paste(
                     status_icon,
                     (
                         int(point.x * scale - (status_icon.size[0] / 2)),
@@ -6624,7 +6995,7 @@ class DreameMowerMapRenderer:
                     mask,
                 )
 
-        new_layer.paste(
+        sprite.paste(
             icon,
             (
                 int(point.x * scale - (icon.size[0] / 2)),
@@ -6636,8 +7007,7 @@ class DreameMowerMapRenderer:
         if not self._low_memory and robot_status == 3:
             if self._robot_sleeping_icon is None:
                 sleeping_icon = (
-                    Image.open(BytesIO(base64.b64decode(MAP_ROBOT_SLEEPING_IMAGE)))
-                    .convert("RGBA")
+                    DreameMowerMapRenderer._icon(MAP_ROBOT_SLEEPING_IMAGE)
                     .rotate(-map_rotation, expand=1)
                 )
                 enhancer = ImageEnhance.Brightness(sleeping_icon)
@@ -6673,7 +7043,7 @@ class DreameMowerMapRenderer:
                     x = point.x + k[0]
                     y = point.y - k[1]
 
-                new_layer.paste(
+                sprite.paste(
                     status_icon,
                     (
                         int(x * scale - (status_icon.size[0] / 2)),
@@ -6681,7 +7051,7 @@ class DreameMowerMapRenderer:
                     ),
                     status_icon,
                 )
-        return new_layer
+        return sprite.render()
 
     def render_segment(
         self,
@@ -6695,8 +7065,7 @@ class DreameMowerMapRenderer:
         active,
         neglected,
     ):
-        new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(new_layer, "RGBA")
+        sprite = DreameMowerMapSprite(layer_size)
         if segment.x is not None and segment.y is not None:
             active = active and not neglected
             text = None
@@ -6710,9 +7079,7 @@ class DreameMowerMapRenderer:
                     icon_set = SEGMENT_ICONS_MATERIAL
 
                 if segment.type in icon_set:
-                    self._segment_icons[segment.type] = Image.open(
-                        BytesIO(base64.b64decode(icon_set[segment.type]))
-                    ).convert("RGBA")
+                    self._segment_icons[segment.type] = DreameMowerMapRenderer._icon(icon_set[segment.type])
                     if self.color_scheme.invert and not (self.config.name_background and self.icon_set != 2):
                         enhancer = ImageEnhance.Brightness(self._segment_icons[segment.type])
                         self._segment_icons[segment.type] = enhancer.enhance(0.1)
@@ -6732,17 +7099,11 @@ class DreameMowerMapRenderer:
             text_font = None
             order_font = None
             render_font = text and (self.config.name or segment.type == 0 or segment.index > 0)
-            if self._font_file is None and (render_font or (segment.order and self.config.order)):
-                self._font_file = zlib.decompress(base64.b64decode(MAP_FONT), zlib.MAX_WBITS | 32)
-
-            if render_font and self._font_file:
-                text_font = ImageFont.truetype(
-                    BytesIO(self._font_file),
-                    int((size * 1.9)) if segment.index or icon is None else int((size * 1.7)),
-                )
+            if render_font:
+                text_font = self._get_font(int((size * 1.9)) if segment.index or icon is None else int((size * 1.7)))
 
             if active and segment.order and self.config.order:
-                order_font = ImageFont.truetype(BytesIO(self._font_file), int((size * 2.1)))
+                order_font = self._get_font(int((size * 2.1)))
 
             p = Point(segment.x, segment.y).to_img(dimensions, False)
             x = p.x
@@ -6773,7 +7134,7 @@ class DreameMowerMapRenderer:
                     y1 = y + size
 
                     if text_font:
-                        left, top, tw, th = draw.textbbox((0, 0), text, text_font)
+                        left, top, tw, th = sprite.textbbox((0, 0), text, text_font)
                         ws = tw / 4
 
                         if segment.index or icon is None:
@@ -6853,7 +7214,7 @@ class DreameMowerMapRenderer:
                             and active
                             and not neglected
                         ):
-                            draw.rounded_rectangle(
+                            sprite.rounded_rectangle(
                                 [
                                     int(x0 * scale),
                                     int(y0 * scale),
@@ -6880,11 +7241,11 @@ class DreameMowerMapRenderer:
                             stroke_fill=stroke_color,
                         )
                         icon_text = icon_text.rotate(-rotation, expand=1)
-                        new_layer.paste(icon_text, (int(tx), int(ty)), icon_text)
+                        sprite.paste(icon_text, (int(tx), int(ty)), icon_text)
                         if self.icon_set == 1:
                             icon_size *= 1.3
                     elif active:  # and not self.config.name_background
-                        draw.ellipse(
+                        sprite.ellipse(
                             [x0 * scale, y0 * scale, x1 * scale, y1 * scale],
                             fill=(
                                 self.color_scheme.segment[segment.color_index][1]
@@ -6904,7 +7265,7 @@ class DreameMowerMapRenderer:
                         else:
                             icon = icon.resize((int(s), int(s)))
                         icon = icon.rotate(-rotation, expand=1)
-                        new_layer.paste(
+                        sprite.paste(
                             icon,
                             (
                                 int(x * scale - (icon.size[0] / 2)),
@@ -7080,7 +7441,7 @@ class DreameMowerMapRenderer:
                         )
 
                 icon = icon.rotate(-rotation, expand=1)
-                new_layer.paste(
+                sprite.paste(
                     icon,
                     (
                         int((x * scale) - ((icon.size[0]) / 2)),
@@ -7088,7 +7449,7 @@ class DreameMowerMapRenderer:
                     ),
                     icon,
                 )
-        return new_layer
+        return sprite.render()
 
     def render_obstacle(self, obstacle, layer_size, dimensions, size, rotation, scale):
         if obstacle.ignore_status == 1:
@@ -7096,34 +7457,31 @@ class DreameMowerMapRenderer:
                 obstacle.type.value not in self._obstacle_hidden_icons
                 and obstacle.type.value in OBSTACLE_TYPE_TO_HIDDEN_ICON
             ):
-                self._obstacle_hidden_icons[obstacle.type.value] = Image.open(
-                    BytesIO(base64.b64decode(OBSTACLE_TYPE_TO_HIDDEN_ICON[obstacle.type.value]))
-                ).convert("RGBA")
+                self._obstacle_hidden_icons[obstacle.type.value] = DreameMowerMapRenderer._icon(
+                    OBSTACLE_TYPE_TO_HIDDEN_ICON[obstacle.type.value]
+                )
             icon = self._obstacle_hidden_icons.get(obstacle.type.value)
         else:
             if obstacle.type.value not in self._obstacle_icons and obstacle.type.value in OBSTACLE_TYPE_TO_ICON:
-                self._obstacle_icons[obstacle.type.value] = Image.open(
-                    BytesIO(base64.b64decode(OBSTACLE_TYPE_TO_ICON[obstacle.type.value]))
-                ).convert("RGBA")
+                self._obstacle_icons[obstacle.type.value] = DreameMowerMapRenderer._icon(
+                    OBSTACLE_TYPE_TO_ICON[obstacle.type.value]
+                )
             icon = self._obstacle_icons.get(obstacle.type.value)
 
         if icon:
-            new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
+            sprite = DreameMowerMapSprite(layer_size)
             icon_size = size * scale * (1 if obstacle.ignore_status == 1 else 0.85)
-            draw = ImageDraw.Draw(new_layer, "RGBA")
 
             if obstacle.ignore_status != 2 and self._obstacle_background is None:
-                self._obstacle_background = Image.open(BytesIO(base64.b64decode(MAP_ICON_OBSTACLE_BG_DREAME))).convert(
-                    "RGBA"
-                )
+                self._obstacle_background = DreameMowerMapRenderer._icon(MAP_ICON_OBSTACLE_BG_DREAME).copy()
                 s = int(size * scale * 2)
                 self._obstacle_background.thumbnail((s, s), Image.Resampling.LANCZOS)
                 self._obstacle_background = self._obstacle_background.rotate(-rotation, expand=1)
 
             if obstacle.ignore_status == 2 and self._obstacle_hidden_background is None:
-                self._obstacle_hidden_background = Image.open(
-                    BytesIO(base64.b64decode(MAP_ICON_OBSTACLE_HIDDEN_BG_DREAME))
-                ).convert("RGBA")
+                self._obstacle_hidden_background = DreameMowerMapRenderer._icon(
+                    MAP_ICON_OBSTACLE_HIDDEN_BG_DREAME
+                ).copy()
                 s = int((size * 0.75) * scale * 2)
                 self._obstacle_hidden_background.thumbnail((s, s), Image.Resampling.LANCZOS)
                 self._obstacle_hidden_background = self._obstacle_hidden_background.rotate(-rotation, expand=1)
@@ -7164,7 +7522,7 @@ class DreameMowerMapRenderer:
                 y_offset = -offset
                 y = y - pos_offset
 
-            new_layer.paste(
+            sprite.paste(
                 background_image,
                 (
                     int(round(x * scale - (background_image.size[0] / 2) + x_offset)),
@@ -7179,7 +7537,7 @@ class DreameMowerMapRenderer:
                     (34, 109, 242, 240),
                 ).rotate(-rotation, expand=1)
             else:
-                draw.ellipse(
+                sprite.ellipse(
                     [
                         (x - bg_size) * scale,
                         (y - bg_size) * scale,
@@ -7198,7 +7556,7 @@ class DreameMowerMapRenderer:
                 )
                 icon = icon.resize((int(icon_size), int(icon_size))).rotate(-rotation, expand=1)
 
-            new_layer.paste(
+            sprite.paste(
                 icon,
                 (
                     int(round(x * scale - (icon_size / 2))),
@@ -7207,23 +7565,18 @@ class DreameMowerMapRenderer:
                 icon,
             )
 
-            return new_layer
+            return sprite.render()
 
     def render_cruise_point(self, index, cruise_point, layer_size, dimensions, size, rotation, scale):
-        new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(new_layer, "RGBA")
+        sprite = DreameMowerMapSprite(layer_size)
         if cruise_point.type == 1 and self._cruise_path_point_background is None:
-            self._cruise_path_point_background = Image.open(
-                BytesIO(base64.b64decode(MAP_ICON_CRUISE_POINT_BG_DREAME))
-            ).convert("RGBA")
+            self._cruise_path_point_background = DreameMowerMapRenderer._icon(MAP_ICON_CRUISE_POINT_BG_DREAME).copy()
             s = int(size * scale * 3)
             self._cruise_path_point_background.thumbnail((s, s), Image.Resampling.LANCZOS)
             self._cruise_path_point_background = self._cruise_path_point_background.rotate(-rotation, expand=1)
 
         if cruise_point.type != 1 and self._cruise_point_background is None:
-            self._cruise_point_background = Image.open(
-                BytesIO(base64.b64decode(MAP_ICON_CRUISE_POINT_DREAME))
-            ).convert("RGBA")
+            self._cruise_point_background = DreameMowerMapRenderer._icon(MAP_ICON_CRUISE_POINT_DREAME).copy()
             s = int(round(size * scale * 2))
             self._cruise_point_background.thumbnail((s, s), Image.Resampling.LANCZOS)
             self._cruise_point_background = self._cruise_point_background.rotate(-rotation, expand=1)
@@ -7261,7 +7614,7 @@ class DreameMowerMapRenderer:
             y_offset = -offset
             y = y - pos_offset
 
-        new_layer.paste(
+        sprite.paste(
             background_image,
             (
                 int(round(x * scale - (background_image.size[0] / 2) + x_offset)),
@@ -7270,7 +7623,7 @@ class DreameMowerMapRenderer:
         )
 
         if cruise_point.type == 1:
-            draw.ellipse(
+            sprite.ellipse(
                 [
                     (x - bg_size) * scale,
                     (y - bg_size) * scale,
@@ -7284,10 +7637,7 @@ class DreameMowerMapRenderer:
             text_box = Image.new("RGBA", (bg_size * 2 * scale, bg_size * 2 * scale), (255, 255, 255, 0))
             text_box_draw = ImageDraw.Draw(text_box, "RGBA")
 
-            if self._font_file is None:
-                self._font_file = zlib.decompress(base64.b64decode(MAP_FONT), zlib.MAX_WBITS | 32)
-
-            font = ImageFont.truetype(BytesIO(self._font_file), int((bg_size * 1.5 * scale)))
+            font = self._get_font(int((bg_size * 1.5 * scale)))
 
             text = str(index)
             left, top, tw, th = text_box_draw.textbbox((0, 0), text, font)
@@ -7303,13 +7653,13 @@ class DreameMowerMapRenderer:
                 stroke_fill=(255, 255, 255, 100),
             )
             text_box = text_box.rotate(-rotation, expand=1)
-            new_layer.paste(
+            sprite.paste(
                 text_box,
                 (int(round((x - bg_size) * scale)), int(round((y - bg_size) * scale))),
                 text_box,
             )
 
-        return new_layer
+        return sprite.render()
 
     def render_furniture(self, furniture, furniture_version, layer_size, dimensions, size, rotation, scale):
         draw_image = furniture.width and furniture.height
@@ -7321,19 +7671,17 @@ class DreameMowerMapRenderer:
         if draw_image:
             furniture_images = FURNITURE_V2_TYPE_TO_IMAGE if furniture_version == 2 else FURNITURE_TYPE_TO_IMAGE
             if furniture_type not in self._furniture_images and furniture_type in furniture_images:
-                img = np.array(Image.open(BytesIO(base64.b64decode(furniture_images[furniture_type]))).convert("RGBA"))
+                img = np.array(DreameMowerMapRenderer._icon(furniture_images[furniture_type]))
                 img[..., 3] = 235 * (img[..., 3] > 0)
                 self._furniture_images[furniture_type] = Image.fromarray(img)
             icon = self._furniture_images.get(furniture_type)
         else:
             furniture_icons = FURNITURE_V2_TYPE_TO_ICON if furniture_version == 2 else FURNITURE_TYPE_TO_ICON
             if furniture_type not in self._furniture_icons and furniture_type in furniture_icons:
-                self._furniture_icons[furniture_type] = Image.open(
-                    BytesIO(base64.b64decode(furniture_icons[furniture_type]))
-                ).convert("RGBA")
+                self._furniture_icons[furniture_type] = DreameMowerMapRenderer._icon(furniture_icons[furniture_type])
             icon = self._furniture_icons.get(furniture_type)
         if icon:
-            new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
+            sprite = DreameMowerMapSprite(layer_size)
             if draw_image:
                 w = (furniture.width / dimensions.grid_size) * dimensions.scale
                 h = (furniture.height / dimensions.grid_size) * dimensions.scale
@@ -7354,7 +7702,7 @@ class DreameMowerMapRenderer:
                     img.thumbnail((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
                 img = img.rotate(-(furniture.angle * 2), expand=1)
 
-                new_layer.paste(
+                sprite.paste(
                     img,
                     (
                         int((x * scale) - ((img.size[0]) / 2)),
@@ -7365,9 +7713,7 @@ class DreameMowerMapRenderer:
             else:
                 icon_size = size * scale * 1.15
                 if self._furniture_background is None:
-                    self._furniture_background = Image.open(
-                        BytesIO(base64.b64decode(MAP_ICON_OBSTACLE_BG_DREAME))
-                    ).convert("RGBA")
+                    self._furniture_background = DreameMowerMapRenderer._icon(MAP_ICON_OBSTACLE_BG_DREAME).copy()
                     s = int(size * scale * 2)
                     self._furniture_background.thumbnail((s, s), Image.Resampling.LANCZOS)
                     self._furniture_background = self._furniture_background.rotate(-rotation, expand=1)
@@ -7400,7 +7746,7 @@ class DreameMowerMapRenderer:
                     y_offset = -offset
                     y = y - pos_offset
 
-                new_layer.paste(
+                sprite.paste(
                     self._furniture_background,
                     (
                         int(round(x * scale - (self._furniture_background.size[0] / 2) + x_offset)),
@@ -7410,7 +7756,7 @@ class DreameMowerMapRenderer:
 
                 icon = icon.resize((int(icon_size), int(icon_size))).rotate(-rotation, expand=1)
 
-                new_layer.paste(
+                sprite.paste(
                     icon,
                     (
                         int(round(x * scale - (icon_size / 2))),
@@ -7419,7 +7765,7 @@ class DreameMowerMapRenderer:
                     icon,
                 )
 
-            return new_layer
+            return sprite.render()
 
     def render_router(
         self,
@@ -7430,19 +7776,17 @@ class DreameMowerMapRenderer:
         rotation,
         scale,
     ):
-        new_layer = Image.new("RGBA", layer_size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(new_layer, "RGBA")
+        sprite = DreameMowerMapSprite(layer_size)
         icon_size = int(size * scale)
         if self._wifi_icon is None:
             self._wifi_icon = (
-                Image.open(BytesIO(base64.b64decode(MAP_WIFI_IMAGE_DREAME)))
-                .convert("RGBA")
+                DreameMowerMapRenderer._icon(MAP_WIFI_IMAGE_DREAME)
                 .resize((icon_size, icon_size), resample=Image.Resampling.NEAREST)
             )
 
         point = router_position.to_img(dimensions)
         bg_size = (size * 1.2) / 2
-        draw.ellipse(
+        sprite.ellipse(
             [
                 int((point.x - bg_size) * scale),
                 int((point.y - bg_size) * scale),
@@ -7452,7 +7796,7 @@ class DreameMowerMapRenderer:
             fill=(34, 98, 211, 255) if self.color_scheme.dark else (34, 109, 242, 255),
         )
         wifi_icon = self._wifi_icon.rotate(-rotation, expand=1)
-        new_layer.paste(
+        sprite.paste(
             wifi_icon,
             (
                 int((point.x * scale) - (wifi_icon.size[0] / 2)),
@@ -7461,7 +7805,28 @@ class DreameMowerMapRenderer:
             wifi_icon,
         )
 
-        return new_layer
+        return sprite.render()
+
+    @staticmethod
+    def render_image_tiles(image, previous_pixel_image, pixel_image, colors, crop, offset, scale):
+        changed = np.argwhere(previous_pixel_image != pixel_image)
+        if not len(changed):
+            return
+
+        tile_size = MAP_RENDERER_TILE_SIZE
+        for tile_y, tile_x in np.unique(changed // tile_size, axis=0):
+            x0 = max(int(tile_x) * tile_size, crop[0])
+            y0 = max(int(tile_y) * tile_size, crop[1])
+            x1 = min((int(tile_x) + 1) * tile_size, crop[2])
+            y1 = min((int(tile_y) + 1) * tile_size, crop[3])
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            image.paste(
+                Image.fromarray(colors[pixel_image[y0:y1, x0:x1]].repeat(scale, axis=0).repeat(scale, axis=1)),
+                (offset[0] + x0 * scale, offset[1] + y0 * scale),
+            )
+        _LOGGER.debug("Render IMAGE tiles: %s", len(changed))
 
     def render_floor_material(self, image, floor_material, pixel_type, color, dimensions, scale):
         tile_w = 12
@@ -7503,52 +7868,63 @@ class DreameMowerMapRenderer:
                         x_multiplier = tile_w
                         y_multiplier = tile_w
 
-                    for x in range(1, w + 1):
-                        for y in range(y_start, dimensions.height):
-                            xx = int(x * x_multiplier)
-                            if xx < dimensions.width and (
-                                floor_type != 1
-                                or (
-                                    (math.floor((y - 1) / floor_w) % 2 == 0 and x % 2 == 0)
-                                    or (math.floor((y - 1) / floor_w) % 2 == 1 and x % 2 == 1)
-                                )
-                            ):
-                                val = int(pixel_type[xx, y])
-                                if val > 0 and val < 63 and val in tile:
-                                    x_index = (xx * scale) + 1
-                                    y_index = (height - 1) - (y * scale) - 1
-
-                                    if val not in color_map:
-                                        cc = DreameMowerMapRenderer._alpha_composite(color, image[y_index, x_index])
-                                        color_map[val] = cc
-                                    else:
-                                        cc = color_map[val]
-                                    image[y_index, x_index] = cc
-                                    y_index = y_index + 1
-                                    image[y_index, x_index] = cc
-
-                    for x in range(x_start, dimensions.width):
-                        for y in range(1, h + 1):
-                            yy = int(y * y_multiplier)
-                            if yy < dimensions.height and (
-                                floor_type != 2
-                                or (
-                                    (math.floor((x - 1) / floor_w) % 2 == 0 and y % 2 == 0)
-                                    or (math.floor((x - 1) / floor_w) % 2 == 1 and y % 2 == 1)
+                    # Vertical stripes, every selected column of the grid is drawn on the rows starting from y_start
+                    xs = np.arange(1, w + 1)
+                    xxs = (xs * x_multiplier).astype(int)
+                    xs = xs[xxs < dimensions.width]
+                    xxs = xxs[xxs < dimensions.width]
+                    ys = np.arange(y_start, dimensions.height)
+                    values = pixel_type[xxs[:, None], ys[None, :]].astype(int)
+                    mask = np.isin(values, tile) & (values > 0) & (values < 63)
+                    if floor_type == 1:
+                        mask &= ((ys - 1) // floor_w % 2)[None, :] == (xs % 2)[:, None]
+                    i, j = np.nonzero(mask)
+                    stripes = [
+                        (
+                            values[i, j],
+                            (height - 1) - (ys[j] * scale) - 1,
+                            (xxs[i] * scale) + 1,
+                            ((height - 1) - (ys[j] * scale), (xxs[i] * scale) + 1),
+                        )
+                    ]
+
+                    # Horizontal stripes, every selected row of the grid is drawn on the columns starting from x_start
+                    xs = np.arange(x_start, dimensions.width)
+                    ys = np.arange(1, h + 1)
+                    yys = (ys * y_multiplier).astype(int)
+                    ys = ys[yys < dimensions.height]
+                    yys = yys[yys < dimensions.height]
+                    values = pixel_type[xs[:, None], yys[None, :]].astype(int)
+                    mask = np.isin(values, tile) & (values > 0) & (values < 63)
+                    if floor_type == 2:
+                        mask &= ((xs - 1) // floor_w % 2)[:, None] == (ys % 2)[None, :]
+                    i, j = np.nonzero(mask)
+                    stripes.append(
+                        (
+                            values[i, j],
+                            (height - 1) - ((yys[j] * scale) + 1),
+                            xs[i] * scale,
+                            ((height - 1) - ((yys[j] * scale) + 1), (xs[i] * scale) + 1),
+                        )
+                    )
+
+                    # Stripe pixels are only drawn on their own segment so color of a segment is calculated once
+                    # from the first pixel before it is changed
+                    for values, y_index, x_index, _ in stripes:
+                        for val, first in zip(*np.unique(values, return_index=True)):
+                            val = int(val)
+                            if val not in color_map:
+                                color_map[val] = DreameMowerMapRenderer._alpha_composite(
+                                    color, image[y_index[first], x_index[first]]
                                 )
-                            ):
-                                val = int(pixel_type[x, yy])
-                                if val > 0 and val < 63 and val in tile:
-                                    x_index = x * scale
-                                    y_index = (height - 1) - ((yy * scale) + 1)
-                                    if val not in color_map:
-                                        cc = DreameMowerMapRenderer._alpha_composite(color, image[y_index, x_index])
-                                        color_map[val] = cc
-                                    else:
-                                        cc = color_map[val]
-                                    image[y_index, x_index] = cc
-                                    x_index = x_index + 1
-                                    image[y_index, x_index] = cc
+
+                    for values, y_index, x_index, second in stripes:
+                        if len(values):
+                            colors = np.zeros((int(values.max()) + 1, image.shape[2]), dtype=image.dtype)
+                            for val in np.unique(values):
+                                colors[val] = color_map[int(val)]
+                            image[y_index, x_index] = colors[values]
+                            image[second[0], second[1]] = colors[values]
             return image
 
     def render_neglected_segments(
@@ -7565,7 +7941,7 @@ class DreameMowerMapRenderer:
         mask_layer.paste(segment_mask, (0, 0))
 
         if self._map_problem_icon is None:
-            self._map_problem_icon = Image.open(BytesIO(base64.b64decode(MAP_ICON_PROBLEM))).convert("RGBA")
+            self._map_problem_icon = DreameMowerMapRenderer._icon(MAP_ICON_PROBLEM)
 
         if rotation == 0 or rotation == 180 or self._square:
             width = (dimensions.width) + (
@@ -7647,9 +8023,6 @@ class DreameMowerMapRenderer:
             repeats = MAP_ICON_REPEATS_DREAME
             cleaning_mode = MAP_ICON_CLEANING_MODE_DREAME
 
-        if self._light_font_file is None:
-            self._light_font_file = zlib.decompress(base64.b64decode(MAP_FONT_LIGHT), zlib.MAX_WBITS | 32)
-
         resources = MapRendererResources(
             icon_set=self.icon_set,
             robot_type=self._robot_type.value,
@@ -7671,7 +8044,7 @@ class DreameMowerMapRenderer:
                 for k, v in icon_set.items()
             },
             default_map_image=DEFAULT_MAP_IMAGE,
-            font=base64.b64encode(self._light_font_file).decode("utf-8"),
+            font=base64.b64encode(DreameMowerMapRenderer._font_file(True)).decode("utf-8"),
             rotate=MAP_ICON_ROTATE,
             delete=MAP_ICON_DELETE,
             resize=MAP_ICON_RESIZE,
@@ -7751,7 +8124,7 @@ class DreameMowerMapRenderer:
     @property
     def default_map_image(self) -> bytes:
         if self._default_map_image is None:
-            default_map_image = Image.open(BytesIO(base64.b64decode(DEFAULT_MAP_IMAGE))).convert("RGBA")
+            default_map_image = DreameMowerMapRenderer._icon(DEFAULT_MAP_IMAGE)
             self._default_map_image = ImageOps.expand(
                 default_map_image.resize(
                     (
@@ -7766,7 +8139,16 @@ class DreameMowerMapRenderer:
     @property
     def disconnected_map_image(self) -> bytes:
         if self._image:
-            return self._to_buffer(self._image.filter(ImageFilter.GaussianBlur(7 if self._low_resolution else 13)))
+            return self._to_buffer(
+                self._image.filter(ImageFilter.GaussianBlur(7 if self._low_resolution else 13)), False
+            )
+        return self.default_map_image
+
+    def render_disconnected_map_image(self, image_bytes) -> bytes:
+        """Blurred version of an image rendered before, used when renderer is shared between maps"""
+        if image_bytes:
+            image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
+            return self._to_buffer(image.filter(ImageFilter.GaussianBlur(7 if self._low_resolution else 13)), False)
         return self.default_map_image
 
     @property
@@ -9108,6 +9490,57 @@ class DreameMowerMapOptimizer:
             map_data.optimized_pixel_type = pixel_type
             map_data.optimized_dimensions = MapImageDimensions(top, left, height, width, map_data.dimensions.grid_size)
 
+    def _box_sum(self, data, width, height, radius):
+        """Sum of the values in the square with the given radius around each pixel, clipped at the map edges"""
+        total = np.zeros((width + 1, height), np.int32)
+        total[1:] = np.cumsum(data, axis=0)
+        x = np.arange(width)
+        data = total[np.minimum(x + radius + 1, width)] - total[np.maximum(x - radius, 0)]
+        total = np.zeros((width, height + 1), np.int32)
+        total[:, 1:] = np.cumsum(data, axis=1)
+        y = np.arange(height)
+        return total[:, np.minimum(y + radius + 1, height)] - total[:, np.maximum(y - radius, 0)]
+
+    def _wifi_signal_level(self, pixel_type, x, y, width, height):
+        max_count = 0
+        max_px = -1
+        value_count = [0, 0, 0, 0]
+        for delta in range(3, 6):
+            for n in range(y - delta, y + delta + 1):
+                for m in range(x - delta, x + delta + 1):
+                    if n < 0 or n >= height or m < 0 or m >= width:
+                        continue
+
+                    px = int(pixel_type[m, n]) - 11
+                    if px >= 0:
+                        value_count[px] = value_count[px] + 1
+                        if value_count[px] > max_count:
+                            max_count = value_count[px]
+                            max_px = px
+
+            if max_px >= 0:
+                return MapPixelType(max_px + 11)
+        return None
+
+    def _smooth_wifi_map(self, pixel_type, width, height):
+        """Replace each wifi pixel with the most common signal level in the smallest square around it
+        (radius 3 to 5) that contains any"""
+        optimized_pixel_type = np.copy(pixel_type)
+        levels = [(pixel_type == MapPixelType.WIFI_POOR.value + i).astype(np.int32) for i in range(4)]
+        pending = pixel_type > MapPixelType.WIFI_WALL.value
+        for delta in range(3, 6):
+            counts = np.stack([self._box_sum(level, width, height, delta) for level in levels])
+            max_count = counts.max(axis=0)
+            found = pending & (max_count > 0)
+            pending = pending & ~found
+            # On ties the level that reaches the count first in row order wins, resolve those pixels one by one
+            tied = found & (np.count_nonzero(counts == max_count, axis=0) > 1)
+            found = found & ~tied
+            optimized_pixel_type[found] = counts.argmax(axis=0)[found] + MapPixelType.WIFI_POOR.value
+            for x, y in zip(*np.nonzero(tied)):
+                optimized_pixel_type[x, y] = self._wifi_signal_level(pixel_type, int(x), int(y), width, height)
+        return optimized_pixel_type
+
     def optimize(self, map_data, saved_map_data=None, js_optimizer=True):
         if map_data.saved_map:
             return map_data
@@ -9116,33 +9549,9 @@ class DreameMowerMapOptimizer:
             map_data.optimized_pixel_type = np.copy(map_data.pixel_type)
             map_data.optimized_dimensions = map_data.dimensions
             if not map_data.empty_map:
-                for y in range(map_data.dimensions.height):
-                    for x in range(map_data.dimensions.width):
-                        if int(map_data.pixel_type[x, y]) > 2:
-                            max_count = 0
-                            max_px = -1
-                            value_count = [0, 0, 0, 0]
-                            for delta in range(3, 6):
-                                for n in range(y - delta, y + delta + 1):
-                                    for m in range(x - delta, x + delta + 1):
-                                        if (
-                                            n < 0
-                                            or n >= map_data.dimensions.height
-                                            or m < 0
-                                            or m >= map_data.dimensions.width
-                                        ):
-                                            continue
-
-                                        px = int(map_data.pixel_type[m, n]) - 11
-                                        if px >= 0:
-                                            value_count[px] = value_count[px] + 1
-                                            if value_count[px] > max_count:
-                                                max_count = value_count[px]
-                                                max_px = px
-
-                                if max_px >= 0:
-                                    map_data.optimized_pixel_type[x, y] = MapPixelType(max_px + 11)
-                                    break
+                map_data.optimized_pixel_type = self._smooth_wifi_map(
+                    map_data.pixel_type, map_data.dimensions.width, map_data.dimensions.height
+                )
             return map_data
 
         try:
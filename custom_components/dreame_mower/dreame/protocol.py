@@ -8,28 +8,98 @@ import requests
 import zlib
 import ssl
 import queue
-from threading import Thread, Timer
+import socket
+import construct
+import numpy as np
+from collections import deque
+from threading import Lock, Thread, Timer
 from time import sleep
 import time, locale
-from datetime import datetime
+from datetime import datetime, timedelta
 from paho.mqtt.client import Client
 from typing import Any, Dict, Optional, Tuple
 from Crypto.Cipher import ARC4
 from miio.miioprotocol import MiIOProtocol
+from miio.protocol import Message
+from miio.exceptions import RecoverableError
 
 from .exceptions import DeviceException
-from .const import DREAME_STRINGS
+from .const import (
+    DREAME_STRINGS,
+    DEVICE_MAX_IN_FLIGHT_REQUESTS,
+    TRAFFIC_CAPTURE_SIZE,
+    TRAFFIC_CAPTURE_LOG_SAMPLE_RATE,
+    TRAFFIC_CAPTURE_REDACT,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class DreameMowerTrafficCapture:
+    """Opt-in bounded ring buffer of raw device and cloud traffic for offline replay."""
+
+    def __init__(self, max_size: int = TRAFFIC_CAPTURE_SIZE) -> None:
+        self.enabled: bool = False
+        self._buffer: deque = deque(maxlen=max_size)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(self, kind: str, payload: Any, source: str = None) -> None:
+        # Payloads are stored as received, encoding is deferred to export
+        if self.enabled:
+            self._buffer.append((time.time(), kind, source, payload))
+
+    def clear(self) -> None:
+        self._buffer.clear()
+
+    @staticmethod
+    def _redact(data: Any) -> Any:
+        if isinstance(data, dict):
+            return {
+                k: "**REDACTED**" if k in TRAFFIC_CAPTURE_REDACT else DreameMowerTrafficCapture._redact(v)
+                for k, v in data.items()
+            }
+        if isinstance(data, list):
+            return [DreameMowerTrafficCapture._redact(v) for v in data]
+        if isinstance(data, str) and data[:1] in ("{", "["):
+            # Property values may carry JSON encoded objects
+            try:
+                return json.dumps(DreameMowerTrafficCapture._redact(json.loads(data)), separators=(",", ":"))
+            except ValueError:
+                pass
+        return data
+
+    def export(self) -> bytes:
+        """Export captured traffic as zlib compressed JSON lines ordered by time with identifiers redacted."""
+        lines = []
+        for timestamp, kind, source, payload in list(self._buffer):
+            entry = {"t": round(timestamp, 3), "k": kind}
+            if source:
+                # Only the file name of downloaded files is kept, the path contains account and device identifiers
+                entry["s"] = source.rsplit("/", 1)[-1]
+            if isinstance(payload, (bytes, bytearray)):
+                try:
+                    # Messages are stored as parsed JSON so their identifiers can be redacted
+                    entry["d"] = self._redact(json.loads(payload))
+                except ValueError:
+                    entry["b"] = base64.b64encode(payload).decode()
+            else:
+                entry["d"] = self._redact(payload)
+            lines.append(json.dumps(entry, separators=(",", ":"), default=str))
+        return zlib.compress("\n".join(lines).encode("utf-8"), 9)
+
+
 class DreameMowerDeviceProtocol(MiIOProtocol):
-    def __init__(self, ip: str, token: str) -> None:
+    def __init__(self, ip: str, token: str, max_in_flight: int = DEVICE_MAX_IN_FLIGHT_REQUESTS) -> None:
         super().__init__(ip, token, 0, 0, True, 2)
         self.ip = None
         self.token = None
         self._queue = queue.Queue()
         self._thread = None
+        self._socket = None
+        self._session_lock = Lock()
+        self._max_in_flight = max(1, max_in_flight)
         self.set_credentials(ip, token)
 
     def _api_task(self):
@@ -43,6 +113,122 @@ class DreameMowerDeviceProtocol(MiIOProtocol):
                 item[0](response)
             self._queue.task_done()
 
+    def _open_socket(self) -> socket.socket:
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.settimeout(self._timeout)
+            self._socket.connect((self.ip, self.port))
+        return self._socket
+
+    def _close_socket(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def _send_pipelined(self, requests, pending: list[int], results: list[Any]) -> list[int]:
+        """Send pending requests with at most max_in_flight unanswered requests and return the ones to be retried."""
+        waiting = deque(pending)
+        in_flight = {}
+        failed = []
+        sock = self._open_socket()
+
+        while waiting or in_flight:
+            while waiting and len(in_flight) < self._max_in_flight:
+                index = waiting.popleft()
+                command, parameters = requests[index]
+                request = self._create_request(command, parameters)
+                in_flight[request["id"]] = index
+                message = Message.build(
+                    {
+                        "data": {"value": request},
+                        "header": {
+                            "value": {
+                                "length": 0,
+                                "unknown": 0x00000000,
+                                "device_id": self._device_id,
+                                "ts": self._device_ts + timedelta(seconds=1),
+                            }
+                        },
+                        "checksum": 0,
+                    },
+                    token=self.token,
+                )
+                _LOGGER.debug("%s:%s >>: %s", self.ip, self.port, request)
+                try:
+                    sock.send(message)
+                except OSError as ex:
+                    self._close_socket()
+                    raise DeviceException("Failed to send message to the device") from ex
+
+            try:
+                data = sock.recv(4096)
+            except OSError:
+                # Device did not answer in time, everything that is not answered yet needs a new handshake
+                failed.extend(in_flight.values())
+                failed.extend(waiting)
+                break
+
+            try:
+                message = Message.parse(data, token=self.token)
+            except construct.core.ChecksumError as ex:
+                raise DeviceException(
+                    "Got checksum error which indicates use of an invalid token. Please check your token!"
+                ) from ex
+            except Exception:
+                _LOGGER.debug("Unable to parse message from the device: %s", data)
+                continue
+
+            payload = message.data.value
+            if not isinstance(payload, dict):
+                continue
+
+            # Responses of previous attempts are dropped by their message id
+            index = in_flight.pop(payload.get("id"), None)
+            if index is None:
+                continue
+
+            self._device_ts = message.header.value["ts"]
+            _LOGGER.debug("%s:%s (id: %s) << %s", self.ip, self.port, payload["id"], payload)
+
+            if "error" in payload:
+                try:
+                    self._handle_error(payload["error"])
+                except RecoverableError:
+                    failed.append(index)
+                    continue
+
+            results[index] = payload["result"] if "result" in payload else payload
+
+        return failed
+
+    def send_batch(self, requests: list[Tuple[str, Any]], retry_count: int = 2) -> list[Any]:
+        """Send multiple commands over the persistent session and return their results in the same order."""
+        results = [None] * len(requests)
+        pending = list(range(len(requests)))
+        with self._session_lock:
+            while pending:
+                if not self.lazy_discover or not self._discovered:
+                    self.send_handshake()
+
+                pending = self._send_pipelined(requests, pending, results)
+                if pending:
+                    if retry_count <= 0:
+                        raise DeviceException("No response from the device")
+                    _LOGGER.debug("Retrying %s requests, retries left: %s", len(pending), retry_count)
+                    retry_count = retry_count - 1
+                    self._discovered = False
+        return results
+
+    def send(
+        self, command: str, parameters: Any = None, retry_count: int = 2, *, extra_parameters: Dict = None
+    ) -> Any:
+        if extra_parameters is not None:
+            return super().send(command, parameters, retry_count, extra_parameters=extra_parameters)
+        return self.send_batch([(command, parameters)], retry_count)[0]
+
     def send_async(self, callback, command, parameters=None, retry_count=2):
         if self._thread is None:
             self._thread = Thread(target=self._api_task, daemon=True)
@@ -60,6 +246,7 @@ class DreameMowerDeviceProtocol(MiIOProtocol):
                 token = 32 * "0"
             self.token = bytes.fromhex(token)
             self._discovered = False
+            self._close_socket()
 
     @property
     def connected(self) -> bool:
@@ -67,6 +254,7 @@ class DreameMowerDeviceProtocol(MiIOProtocol):
 
     def disconnect(self):
         self._discovered = False
+        self._close_socket()
         if self._thread:
             self._queue.put([])
 
@@ -103,6 +291,8 @@ class DreameMowerDreameHomeCloudProtocol:
         self._uid = None
         self._uuid = None
         self._strings = None
+        self._message_count = 0
+        self.capture = DreameMowerTrafficCapture()
 
     def _api_task(self):
         while True:
@@ -206,8 +396,11 @@ class DreameMowerDreameHomeCloudProtocol:
     def _on_client_message(client, self, message):
         if self._message_callback:
             try:
-                _LOGGER.error("Message received: %s", message.payload.decode("utf-8"))
-                response = json.loads(message.payload.decode("utf-8"))
+                self.capture.record("mqtt", message.payload)
+                self._message_count = self._message_count + 1
+                if self._message_count % TRAFFIC_CAPTURE_LOG_SAMPLE_RATE == 1 and _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Message received (%s): %s", self._message_count, message.payload)
+                response = json.loads(message.payload)
                 if "data" in response and response["data"]:
                     self._message_callback(response["data"])
             except:
@@ -441,6 +634,7 @@ class DreameMowerDreameHomeCloudProtocol:
                 response = None
                 _LOGGER.warning("Unable to get file at %s: %s", url, ex)
             if response is not None and response.status_code == 200:
+                self.capture.record("file", response.content, url.split("?")[0])
                 return response.content
             retries = retries + 1
         return None
@@ -609,6 +803,39 @@ class DreameMowerDreameHomeCloudProtocol:
         self._connected_callback = None
 
 
+class DreameMowerRC4Keystream:
+    """RC4 keystream of a key with the first 1024 bytes already dropped, extended on demand."""
+
+    def __init__(self, key: bytes) -> None:
+        self._cipher = ARC4.new(key)
+        # Drop and prefetch in a single call, most request parameters fit into the first chunk
+        self._keystream = self._cipher.encrypt(bytes(2048))[1024:]
+        self._lock = Lock()
+
+    def xor(self, data: bytes) -> bytes:
+        length = len(data)
+        if length == 0:
+            return b""
+        with self._lock:
+            if len(self._keystream) < length:
+                self._keystream += self._cipher.encrypt(bytes(max(length - len(self._keystream), 1024)))
+        return np.bitwise_xor(
+            np.frombuffer(data, dtype=np.uint8), np.frombuffer(self._keystream, dtype=np.uint8, count=length)
+        ).tobytes()
+
+    def xor_final(self, data: bytes) -> bytes:
+        """XOR data for the last time and release the keystream, remaining bytes are passed through the cipher."""
+        with self._lock:
+            length = min(len(data), len(self._keystream))
+            head = np.bitwise_xor(
+                np.frombuffer(data, dtype=np.uint8, count=length),
+                np.frombuffer(self._keystream, dtype=np.uint8, count=length),
+            ).tobytes()
+            tail = self._cipher.encrypt(memoryview(data)[length:]) if len(data) > length else b""
+            self._keystream = b""
+        return head + tail
+
+
 class DreameMowerMiHomeCloudProtocol:
     def __init__(self, username: str, password: str, country: str) -> None:
         self._username = username
@@ -632,6 +859,7 @@ class DreameMowerMiHomeCloudProtocol:
         self._useragent = f"Android-7.1.1-1.0.0-ONEPLUS A3010-136-{DreameMowerMiHomeCloudProtocol.get_random_agent_id()} APP/xiaomi.smarthome APPV/62830"
         self._locale = locale.getdefaultlocale()[0]
         self._v3 = False
+        self.capture = DreameMowerTrafficCapture()
 
         self._fail_count = 0
         self._connected = False
@@ -798,6 +1026,7 @@ class DreameMowerMiHomeCloudProtocol:
                 response = None
                 _LOGGER.warning("Unable to get file at %s: %s", url, ex)
             if response is not None and response.status_code == 200:
+                self.capture.record("file", response.content, url.split("?")[0])
                 return response.content
             retries = retries + 1
         return None
@@ -993,7 +1222,9 @@ class DreameMowerMiHomeCloudProtocol:
 
         nonce = self.generate_nonce()
         signed_nonce = self.signed_nonce(nonce)
-        fields = self.generate_enc_params(url, "POST", signed_nonce, nonce, params, self._ssecurity)
+        # Request parameters and the response are encrypted from the start of the same keystream
+        keystream = DreameMowerRC4Keystream(base64.b64decode(signed_nonce))
+        fields = self.generate_enc_params(url, "POST", signed_nonce, nonce, params, self._ssecurity, keystream)
 
         while retries < retry_count + 1:
             try:
@@ -1009,7 +1240,7 @@ class DreameMowerMiHomeCloudProtocol:
             if response.status_code == 200:
                 self._fail_count = 0
                 self._connected = True
-                decoded = self.decrypt_rc4(self.signed_nonce(fields["_nonce"]), response.text)
+                decoded = keystream.xor_final(base64.b64decode(response.text))
                 return json.loads(decoded) if decoded else None
             _LOGGER.warn("Execute api call failed with response: %s", response.text)
 
@@ -1081,12 +1312,16 @@ class DreameMowerMiHomeCloudProtocol:
         nonce: str,
         params: Dict[str, str],
         ssecurity: str,
+        keystream: DreameMowerRC4Keystream = None,
     ) -> Dict[str, str]:
         params["rc4_hash__"] = DreameMowerMiHomeCloudProtocol.generate_enc_signature(
             url, method, signed_nonce, params
         )
+        # Every parameter is encrypted from the start of the same keystream
+        if keystream is None:
+            keystream = DreameMowerRC4Keystream(base64.b64decode(signed_nonce))
         for k, v in params.items():
-            params[k] = DreameMowerMiHomeCloudProtocol.encrypt_rc4(signed_nonce, v)
+            params[k] = base64.b64encode(keystream.xor(v.encode())).decode()
         params.update(
             {
                 "signature": DreameMowerMiHomeCloudProtocol.generate_enc_signature(url, method, signed_nonce, params),
@@ -1102,15 +1337,11 @@ class DreameMowerMiHomeCloudProtocol:
 
     @staticmethod
     def encrypt_rc4(password: str, payload: str) -> str:
-        r = ARC4.new(base64.b64decode(password))
-        r.encrypt(bytes(1024))
-        return base64.b64encode(r.encrypt(payload.encode())).decode()
+        return base64.b64encode(DreameMowerRC4Keystream(base64.b64decode(password)).xor(payload.encode())).decode()
 
     @staticmethod
     def decrypt_rc4(password: str, payload: str) -> bytes:
-        r = ARC4.new(base64.b64decode(password))
-        r.encrypt(bytes(1024))
-        return r.encrypt(base64.b64decode(payload))
+        return DreameMowerRC4Keystream(base64.b64decode(password)).xor_final(base64.b64decode(payload))
 
     @staticmethod
     def get_random_agent_id() -> str:
@@ -1135,6 +1366,7 @@ class DreameMowerProtocol:
         self._connected = False
         self._mac = None
         self._account_type = account_type
+        self.capture = DreameMowerTrafficCapture()
 
         if ip and token:
             self.device = DreameMowerDeviceProtocol(ip, token)
@@ -1157,6 +1389,11 @@ class DreameMowerProtocol:
             self.prefer_cloud = True
             self.device_cloud = self.cloud
 
+        # All connections record into the same capture buffer
+        for protocol in (self.cloud, self.device_cloud):
+            if protocol is not None:
+                protocol.capture = self.capture
+
     def set_credentials(self, ip: str, token: str, mac: str = None, account_type: str = "mi"):
         self._mac = mac
         self._account_type = account_type
@@ -1241,7 +1478,18 @@ class DreameMowerProtocol:
             return self.device.send(method, parameters=parameters, retry_count=retry_count)
 
     def get_properties(self, parameters: Any = None, retry_count: int = 1) -> Any:
-        return self.send("get_properties", parameters=parameters, retry_count=retry_count)
+        response = self.send("get_properties", parameters=parameters, retry_count=retry_count)
+        self.capture.record("properties", response)
+        return response
+
+    def get_properties_batch(self, batches: list[Any], retry_count: int = 1) -> list[Any]:
+        if not ((self.prefer_cloud or not self.device) and self.device_cloud) and self.device:
+            # Local device requests are pipelined over a single session
+            responses = self.device.send_batch([("get_properties", batch) for batch in batches], retry_count=retry_count)
+            for response in responses:
+                self.capture.record("properties", response)
+            return responses
+        return [self.get_properties(batch, retry_count=retry_count) for batch in batches]
 
     def set_property(self, siid: int, piid: int, value: Any = None, retry_count: int = 2) -> Any:
         return self.set_properties(
@@ -4,7 +4,10 @@ import base64
 import math
 import json
 import time
-from typing import Any, Dict, Final, List, Optional, OrderedDict
+import zlib
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Final, List, Mapping, Optional, OrderedDict, Tuple
 from enum import IntEnum, Enum
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -1183,6 +1186,27 @@ class DeviceCapability(IntEnum):
     LENSBRUSH = 47
 
 
+@lru_cache(maxsize=None)
+def device_capability_registry(device_capabilities: str) -> Mapping[str, Tuple[Tuple[str, int], ...]]:
+    """Decode the compressed model capability list once into an immutable model -> capabilities registry."""
+    models = json.loads(zlib.decompress(base64.b64decode(device_capabilities), zlib.MAX_WBITS | 32))
+    registry = {}
+    for model, capabilities in models.items():
+        # Resolve model aliases
+        resolved = {model}
+        while isinstance(capabilities, str) and capabilities not in resolved:
+            resolved.add(capabilities)
+            capabilities = models.get(capabilities)
+
+        if capabilities and not isinstance(capabilities, str):
+            registry[model] = tuple(
+                (DeviceCapability(v[0]).name.lower(), v[1])
+                for v in capabilities
+                if v[0] in DeviceCapability._value2member_map_
+            )
+    return MappingProxyType(registry)
+
+
 class DreameMowerDeviceCapability:
     def __init__(self, device) -> None:
         self.list = None
@@ -1255,17 +1279,10 @@ class DreameMowerDeviceCapability:
         if self._device.info and self._device.info.model:
             model = self._device.info.model.replace("mower.", "").replace("dreame.", "").replace("xiaomi.", "")
             device_capability = device_capabilities.get(model)
-            while device_capability and isinstance(device_capability, str):
-                device_capability = device_capabilities.get(device_capability)
             if device_capability:
                 version = self._device.info.version if self._device.info.version else 1
-                for v in device_capability:
-                    capability = v[0]
-                    if capability in DeviceCapability._value2member_map_:
-                        capability = DeviceCapability(capability)
-                        param = capability.name.lower()
-                        if param and hasattr(self, param):
-                            setattr(self, param, bool(version >= v[1]))
+                for param, min_version in device_capability:
+                    setattr(self, param, bool(version >= min_version))
 
         # self.camera_streaming = bool(
         #    self.camera_streaming and (camera_light is not None or self._device.get_property(DreameMowerProperty.CRUISE_SCHEDULE) is not None)
@@ -1403,7 +1420,10 @@ class Point:
 
 class Path(Point):
     def __init__(self, x: float, y: float, path_type: PathType) -> None:
-        super().__init__(x, y)
+        # Paths are created for every point of the mowing path, set the attributes without calling Point.__init__
+        self.x = x
+        self.y = y
+        self.a = None
         self.path_type = path_type
 
     def as_dict(self) -> Dict[str, Any]:
@@ -2171,6 +2191,7 @@ class MapDataPartial:
         self.frame_type: Optional[int] = None  # Map header: frame_type
         self.timestamp_ms: Optional[int] = None  # Data json: timestamp_ms
         self.raw: Optional[bytes] = None  # Unzipped raw map
+        self.header: Optional[Tuple[int, ...]] = None  # Unpacked map header
         self.data_json: Optional[object] = {}  # Data json
 
 
@@ -2241,6 +2262,9 @@ class MapData:
         self.combined_pixel_type: Optional[Any] = None
         # Generated segments from pixel_type
         self.segments: Optional[Dict[int, Segment]] = None
+        # Generated segment adjacency graph from seg_inf.nei_id or pixel_type
+        self.segment_neighbors: Optional[Dict[int, List[int]]] = None
+        self.segment_neighbors_key: Optional[Any] = None  # Source of segment_neighbors, graph is rebuilt when changed
         self.floor_material: Optional[Dict[int, int]] = None  # Generated from seg_inf.material
         self.saved_map: Optional[bool] = None  # Generated for rism map
         self.empty_map: Optional[bool] = None  # Generated from pixel_type
@@ -2670,6 +2694,15 @@ class MapRendererLayer(IntEnum):
     OBSTACLE = 18
     CRUISE_POINTS = 19
     CRUISE_POINT = 20
+    STATIC_OBJECTS = 21
+    SCALED_PATH = 22
+
+
+@dataclass
+class MapRendererSprite:
+    image: Any
+    x: int = 0
+    y: int = 0
 
 
 @dataclass
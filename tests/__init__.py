@@ -0,0 +1 @@
+"""Tests for the Dreame Mower integration."""
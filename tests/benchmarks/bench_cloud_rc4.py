@@ -0,0 +1,90 @@
+"""Benchmark Mi Home cloud request encryption and response decryption against the per value RC4 implementation.
+
+Run with: python -m tests.benchmarks.bench_cloud_rc4
+"""
+
+import base64
+import json
+import os
+import random
+import timeit
+
+from Crypto.Cipher import ARC4
+
+from custom_components.dreame_mower.dreame.protocol import DreameMowerMiHomeCloudProtocol, DreameMowerRC4Keystream
+
+URL = "https://de.api.io.mi.com/app/v2/miotspec/prop/get"
+SSECURITY = base64.b64encode(os.urandom(16)).decode()
+VECTORS = 200
+NUMBER = 5
+
+
+def encrypt_rc4(password: str, payload: str) -> str:
+    r = ARC4.new(base64.b64decode(password))
+    r.encrypt(bytes(1024))
+    return base64.b64encode(r.encrypt(payload.encode())).decode()
+
+
+def decrypt_rc4(password: str, payload: str) -> bytes:
+    r = ARC4.new(base64.b64decode(password))
+    r.encrypt(bytes(1024))
+    return r.encrypt(base64.b64decode(payload))
+
+
+def request_per_value(nonce: str, params: dict, response: str) -> bytes:
+    signed_nonce = DreameMowerMiHomeCloudProtocol.signed_nonce(_Cloud, nonce)
+    params["rc4_hash__"] = DreameMowerMiHomeCloudProtocol.generate_enc_signature(URL, "POST", signed_nonce, params)
+    for k, v in params.items():
+        params[k] = encrypt_rc4(signed_nonce, v)
+    params["signature"] = DreameMowerMiHomeCloudProtocol.generate_enc_signature(URL, "POST", signed_nonce, params)
+    return decrypt_rc4(signed_nonce, response)
+
+
+def request_shared_keystream(nonce: str, params: dict, response: str) -> bytes:
+    signed_nonce = DreameMowerMiHomeCloudProtocol.signed_nonce(_Cloud, nonce)
+    keystream = DreameMowerRC4Keystream(base64.b64decode(signed_nonce))
+    DreameMowerMiHomeCloudProtocol.generate_enc_params(URL, "POST", signed_nonce, nonce, params, SSECURITY, keystream)
+    return keystream.xor_final(base64.b64decode(response))
+
+
+class _Cloud:
+    _ssecurity = SSECURITY
+
+
+def vectors(result_size: int) -> list:
+    """Property batch requests of 15 properties with a response of the given number of results."""
+    items = []
+    for _ in range(VECTORS):
+        nonce = DreameMowerMiHomeCloudProtocol.generate_nonce()
+        signed_nonce = DreameMowerMiHomeCloudProtocol.signed_nonce(_Cloud, nonce)
+        properties = [{"did": "-1", "siid": random.randint(1, 20), "piid": random.randint(1, 60)} for _ in range(15)]
+        params = {"data": json.dumps({"params": properties}, separators=(",", ":"))}
+        result = [dict(p, code=0, value=random.randint(0, 10**6)) for p in properties[:1] for _ in range(result_size)]
+        response = encrypt_rc4(signed_nonce, json.dumps({"code": 0, "result": result}))
+        items.append((nonce, params, response))
+    return items
+
+
+def main() -> None:
+    for name, result_size in (("small", 15), ("medium", 150), ("large", 5000)):
+        items = vectors(result_size)
+        for nonce, params, response in items:
+            assert request_per_value(nonce, dict(params), response) == request_shared_keystream(
+                nonce, dict(params), response
+            )
+
+        timings = []
+        for function in (request_per_value, request_shared_keystream):
+            seconds = min(
+                timeit.repeat(
+                    lambda: [function(nonce, dict(params), response) for nonce, params, response in items],
+                    number=NUMBER,
+                    repeat=3,
+                )
+            )
+            timings.append(seconds / NUMBER / VECTORS * 1e6)
+        print(f"{name:>6} response: {timings[0]:8.1f} -> {timings[1]:8.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Tests for the pipelined local transport of the device protocol."""
+
+import socket
+import time
+from datetime import datetime
+from threading import Event, Thread
+
+import pytest
+from miio.miioprotocol import MiIOProtocol
+from miio.protocol import Message
+
+from custom_components.dreame_mower.dreame.exceptions import DeviceException
+from custom_components.dreame_mower.dreame.protocol import DreameMowerDeviceProtocol
+
+TOKEN = "00112233445566778899aabbccddeeff"
+HELLO = bytes.fromhex("21310020" + "ff" * 28)
+DEVICE_ID = b"\x00\x00\x00\x01"
+
+
+class UdpDeviceStandIn:
+    """Local UDP device that answers handshakes and replies to buffered requests in reverse order."""
+
+    def __init__(self, drop: dict[str, int] | None = None, stale: bool = False) -> None:
+        self.token = bytes.fromhex(TOKEN)
+        self.drop = dict(drop or {})
+        self.stale = stale
+        self._late = {}
+        self.handshakes = 0
+        self.received = []
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.settimeout(0.05)
+        self.port = self._socket.getsockname()[1]
+        self._stop = Event()
+        self._thread = Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _reply(self, request: dict, addr) -> None:
+        response = {
+            "id": request["id"],
+            "result": [{"did": p["did"], "code": 0, "value": p["did"]} for p in request["params"]],
+        }
+        message = Message.build(
+            {
+                "data": {"value": response},
+                "header": {"value": {"length": 0, "unknown": 0, "device_id": DEVICE_ID, "ts": datetime.now()}},
+                "checksum": 0,
+            },
+            token=self.token,
+        )
+        self._socket.sendto(message, addr)
+
+    def _flush(self, pending: list) -> None:
+        # Answer everything received since the last flush in reverse order
+        while pending:
+            self._reply(*pending.pop())
+
+    def _serve(self) -> None:
+        pending = []
+        while not self._stop.is_set():
+            try:
+                data, addr = self._socket.recvfrom(4096)
+            except socket.timeout:
+                self._flush(pending)
+                continue
+            except OSError:
+                return
+
+            if data == HELLO:
+                self.handshakes = self.handshakes + 1
+                self._socket.sendto(
+                    HELLO[:4] + bytes(4) + DEVICE_ID + int(time.time()).to_bytes(4, "big") + self.token, addr
+                )
+                continue
+
+            request = Message.parse(data, token=self.token).data.value
+            did = request["params"][0]["did"]
+            self.received.append(did)
+            if self.drop.get(did):
+                self.drop[did] = self.drop[did] - 1
+                if self.stale:
+                    self._late[did] = (request, addr)
+                continue
+            pending.append((request, addr))
+            if did in self._late:
+                # Response of the dropped attempt arrives late, right before the response of the retry
+                pending.append(self._late.pop(did))
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._socket.close()
+
+
+@pytest.fixture
+def stand_in(request, monkeypatch):
+    device = UdpDeviceStandIn(**getattr(request, "param", {}))
+
+    def discover(addr=None, timeout=5):
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(timeout)
+        try:
+            s.sendto(HELLO, ("127.0.0.1", device.port))
+            return Message.parse(s.recvfrom(1024)[0])
+        finally:
+            s.close()
+
+    monkeypatch.setattr(MiIOProtocol, "discover", staticmethod(discover))
+    yield device
+    device.close()
+
+
+def _protocol(stand_in: UdpDeviceStandIn, max_in_flight: int = 4) -> DreameMowerDeviceProtocol:
+    protocol = DreameMowerDeviceProtocol("127.0.0.1", TOKEN, max_in_flight)
+    protocol.port = stand_in.port
+    protocol._timeout = 0.5
+    return protocol
+
+
+def _batch(*dids: str) -> list:
+    return [("get_properties", [{"did": did}]) for did in dids]
+
+
+def _values(results: list) -> list:
+    return [result[0]["value"] for result in results]
+
+
+def test_reordered_responses_keep_request_order(stand_in):
+    protocol = _protocol(stand_in)
+    dids = [str(i) for i in range(10)]
+    try:
+        assert _values(protocol.send_batch(_batch(*dids))) == dids
+        assert stand_in.handshakes == 1
+        assert stand_in.received == dids
+    finally:
+        protocol.disconnect()
+
+
+@pytest.mark.parametrize("stand_in", [{"drop": {"lost": 1}}], indirect=True)
+def test_dropped_response_is_retried_after_handshake(stand_in):
+    protocol = _protocol(stand_in)
+    try:
+        assert _values(protocol.send_batch(_batch("a", "lost", "b"))) == ["a", "lost", "b"]
+        assert stand_in.handshakes == 2
+        assert stand_in.received.count("lost") == 2
+        # Answered requests are not sent again
+        assert stand_in.received.count("a") == 1
+    finally:
+        protocol.disconnect()
+
+
+@pytest.mark.parametrize("stand_in", [{"drop": {"late": 1}, "stale": True}], indirect=True)
+def test_stale_response_of_previous_attempt_is_ignored(stand_in):
+    protocol = _protocol(stand_in, 1)
+    try:
+        assert _values(protocol.send_batch(_batch("late", "next"))) == ["late", "next"]
+        assert stand_in.handshakes == 2
+    finally:
+        protocol.disconnect()
+
+
+@pytest.mark.parametrize("stand_in", [{"drop": {"lost": 3}}], indirect=True)
+def test_retries_exhausted(stand_in):
+    protocol = _protocol(stand_in)
+    try:
+        with pytest.raises(DeviceException):
+            protocol.send_batch(_batch("lost"), retry_count=2)
+        assert stand_in.handshakes == 3
+    finally:
+        protocol.disconnect()